@@ -5,6 +5,8 @@ import dateparser
 from typing import List, Dict
 from openai import OpenAI
 
+from tracing import span, count, traced
+
 SYSTEM = """You extract actionable student events from raw emails/announcements.
 Return JSON with key 'events' -> list of:
 { "type":"exam|deadline|class|meeting|notice",
@@ -23,6 +25,7 @@ DP_SETTINGS = {
 def _iso(dt) -> str:
     return dt.astimezone().strftime("%Y-%m-%dT%H:%M:%SZ")
 
+@traced("parse.rules")
 def _rule_based(text: str) -> List[Dict]:
     text = re.sub(r'\s+', ' ', text)
     events: List[Dict] = []
@@ -32,6 +35,7 @@ def _rule_based(text: str) -> List[Dict]:
     patt1 = re.findall(r'(exam|midterm|quiz|class|lecture|meeting)\s*(?:on|at)?\s*([A-Za-z]{3,9}\s+\d{1,2}(?:,\s*\d{4})?|\d{4}-\d{2}-\d{2}|tomorrow|today)?\s*(?:at)?\s*(\d{1,2}[:.]\d{2})?\s*(?:in|at)?\s*([A-Za-z]\s?\w\s?(?:Room|Hall|Block)?\s?\w*)?', text, flags=re.IGNORECASE)
     for typ, day, time, loc in patt1:
         when_str = " ".join([x for x in [day, time] if x])
+        count("parse.dateparser")
         dt = dateparser.parse(when_str, settings=DP_SETTINGS)
         if dt:
             events.append({
@@ -45,6 +49,7 @@ def _rule_based(text: str) -> List[Dict]:
     # 2) “deadline due on Oct 28” / “Project due 2025-11-01 23:59”
     patt2 = re.findall(r'(deadline|due)\s*(?:on|:)?\s*([A-Za-z]{3,9}\s+\d{1,2}(?:,\s*\d{4})?|\d{4}-\d{2}-\d{2}(?:\s*\d{1,2}[:.]\d{2})?)', text, flags=re.IGNORECASE)
     for _, d in patt2:
+        count("parse.dateparser")
         dt = dateparser.parse(d, settings=DP_SETTINGS)
         if dt:
             events.append({"type":"deadline","title":"Deadline","when":_iso(dt),"location":"","notes":f"Due: {d}"})
@@ -57,55 +62,60 @@ def extract_events_from_texts(texts: List[str]) -> List[Dict]:
 
     # AI fallback (enrich + catch tricky phrasing)
     try:
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            temperature=0.1,
-            response_format={"type":"json_object"},
-            messages=[
-                {"role":"system","content":SYSTEM},
-                {"role":"user","content":f"Extract events from the following text:\n{joined[:12000]}"}]
-        )
+        with span("parse.llm", chars=len(joined[:12000])):
+            client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            resp = client.chat.completions.create(
+                model="gpt-4o-mini",
+                temperature=0.1,
+                response_format={"type":"json_object"},
+                messages=[
+                    {"role":"system","content":SYSTEM},
+                    {"role":"user","content":f"Extract events from the following text:\n{joined[:12000]}"}]
+            )
         data = json.loads(resp.choices[0].message.content)
         ai = data.get("events", [])
     except Exception:
+        count("parse.llm_errors")
         ai = []
 
     # merge + dedupe
     all_events = rb + ai
     out: List[Dict] = []
     seen = set()
-    for e in all_events:
-        title = (e.get("title") or "Event").strip()
-        when  = e.get("when") or ""
-        try:
-            dt = dateparser.parse(when, settings=DP_SETTINGS) if "T" not in when else datetime.fromisoformat(when.replace("Z","+00:00"))
-        except Exception:
-            continue
-        when_iso = _iso(dt)
-        key = (title, when_iso)
-        if key in seen: 
-            continue
-        seen.add(key)
-        e["title"] = title
-        e["when"]  = when_iso
-        e["location"] = e.get("location","")
-        e["notes"] = e.get("notes","")
-        out.append(e)
+    with span("parse.merge"):
+        for e in all_events:
+            title = (e.get("title") or "Event").strip()
+            when  = e.get("when") or ""
+            try:
+                dt = dateparser.parse(when, settings=DP_SETTINGS) if "T" not in when else datetime.fromisoformat(when.replace("Z","+00:00"))
+            except Exception:
+                continue
+            when_iso = _iso(dt)
+            key = (title, when_iso)
+            if key in seen: 
+                continue
+            seen.add(key)
+            e["title"] = title
+            e["when"]  = when_iso
+            e["location"] = e.get("location","")
+            e["notes"] = e.get("notes","")
+            out.append(e)
+    count("parse.events", len(out))
     return out
 
 def generate_study_plan(goal: str, duration: str) -> str:
     prompt = f"Create a crisp, motivational {duration.lower()} study plan for: {goal}. Use headings and short bullet points."
     try:
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            temperature=0.2,
-            messages=[
-                {"role":"system","content":"You write sharp, structured study plans."},
-                {"role":"user","content":prompt}
-            ]
-        )
+        with span("llm.study_plan"):
+            client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            resp = client.chat.completions.create(
+                model="gpt-4o-mini",
+                temperature=0.2,
+                messages=[
+                    {"role":"system","content":"You write sharp, structured study plans."},
+                    {"role":"user","content":prompt}
+                ]
+            )
         return resp.choices[0].message.content.strip()
     except Exception as e:
         return f"Could not generate plan: {e}"
@@ -4,6 +4,8 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 import streamlit as st
 
+import tracing
+from tracing import span
 from email_reader import fetch_recent_emails
 from ai_parser import extract_events_from_texts, generate_study_plan
 from notifier import send_email
@@ -45,6 +47,12 @@ with st.sidebar:
     tz_choice  = st.selectbox("Timezone", ["Europe/Istanbul","Europe/Berlin","Europe/London","Asia/Almaty","Asia/Dubai","UTC"], index=0)
     st.session_state["tz"] = ZoneInfo(tz_choice)
     st.caption("Use a Google *App Password* (Security → App passwords). Type without spaces.")
+    profile_on = st.toggle("⏱ Profile pipeline", value=False, help="Show per-stage timings for this run")
+
+# spans go to a collector owned by this script run, so each rerun reports only its
+# own work and other sessions (same process, same tracing module) are untouched
+profile = tracing.Collector() if profile_on else None
+tracing.set_collector(profile)
 
 st.markdown(f"""
 <div class="hero">
@@ -66,22 +74,23 @@ with left:
         except Exception:
             return None
 
-    if events:
-        events = [e for e in events if _parse_iso(e.get("when",""))]
-        events.sort(key=lambda e: _parse_iso(e["when"]))
-        for e in events:
-            dt_local = _parse_iso(e["when"]).astimezone(st.session_state["tz"])
-            label = dt_local.strftime("%a %d %b, %H:%M")
-            st.markdown(f"""
-            <div class="event">
-              <div class="title">{e.get('title','(no title)')}</div>
-              <div class="when">🕒 {label}</div>
-              <div class="where">📍 {e.get('location','')}</div>
-              <div class="small-note">{e.get('notes','')}</div>
-            </div>
-            """, unsafe_allow_html=True)
-    else:
-        st.info("No events detected yet. As soon as related emails arrive, Pairent will parse them and populate your schedule automatically.")
+    with span("app.render_schedule", events=len(events)):
+        if events:
+            events = [e for e in events if _parse_iso(e.get("when",""))]
+            events.sort(key=lambda e: _parse_iso(e["when"]))
+            for e in events:
+                dt_local = _parse_iso(e["when"]).astimezone(st.session_state["tz"])
+                label = dt_local.strftime("%a %d %b, %H:%M")
+                st.markdown(f"""
+                <div class="event">
+                  <div class="title">{e.get('title','(no title)')}</div>
+                  <div class="when">🕒 {label}</div>
+                  <div class="where">📍 {e.get('location','')}</div>
+                  <div class="small-note">{e.get('notes','')}</div>
+                </div>
+                """, unsafe_allow_html=True)
+        else:
+            st.info("No events detected yet. As soon as related emails arrive, Pairent will parse them and populate your schedule automatically.")
 
     # Email my schedule
     if events and st.button("📧 Email my schedule", use_container_width=True):
@@ -118,7 +127,7 @@ with right:
         if not email_addr or not app_pass:
             st.error("Please fill your email and App Password in the sidebar.")
         else:
-            with st.spinner("Reading Inbox and extracting events…"):
+            with st.spinner("Reading Inbox and extracting events…"), span("app.sync"):
                 subjects, bodies = fetch_recent_emails(email_addr, app_pass, limit=25)
                 if not bodies:
                     st.warning("No emails read (Inbox empty or IMAP login failed).")
@@ -191,4 +200,9 @@ with right:
     if st.button("🙌 Thanks", use_container_width=True):
         st.success("We’re glad you’re here! Pairent will keep your schedule tidy.")
 
+if profile is not None:
+    with st.expander("⏱ Profile (this run)", expanded=True):
+        st.code(tracing.format_report(profile))
+        st.download_button("Download spans (.jsonl)", tracing.to_jsonl(profile), file_name="pairent_profile.jsonl")
+
 st.caption("© 2025 Pairent — Instant-response beta")
@@ -0,0 +1,175 @@
+# archive.py — append-only, segmented columnar archive of completed tasks
+#
+# Layout (next to planner_data.json):
+#   planner_archive/tail.jsonl        open segment, one full task record per line
+#   planner_archive/seg_00001.npz     sealed segment columns (see COLUMNS)
+#   planner_archive/seg_00001.jsonl   sealed segment's full records, kept for reference
+#   planner_archive/courses.json      course name dictionary (index = course_id)
+# Once the tail holds SEGMENT_ROWS records it is sealed into columns; nothing is
+# ever rewritten, so `done` costs one appended line instead of a full JSON dump.
+
+from __future__ import annotations
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from tracing import traced
+
+ARCHIVE_DIR = Path(__file__).with_name("planner_archive")
+SEGMENT_ROWS = 4096
+NO_TIME = -1          # missing timestamp / duration marker
+NO_COURSE = -1
+_EPOCH = datetime(1970, 1, 1)
+
+COLUMNS = {
+    "priority": np.int8,
+    "duration_min": np.int32,   # estimated, from the task text
+    "spent_min": np.int32,      # actual, if given to `done --spent`
+    "created": np.int64,        # local wall-clock seconds since 1970-01-01
+    "completed": np.int64,
+    "due": np.int64,
+    "course_id": np.int32,
+}
+
+def _secs(iso) -> int:
+    if not iso:
+        return NO_TIME
+    try:
+        dt = datetime.fromisoformat(iso)
+    except (TypeError, ValueError):
+        return NO_TIME
+    return int((dt.replace(tzinfo=None) - _EPOCH).total_seconds())
+
+# ---------------------------- Writing ----------------------------
+def _tail_path(root: Path) -> Path:
+    return root / "tail.jsonl"
+
+def _segments(root: Path) -> List[Path]:
+    return sorted(root.glob("seg_*.npz"))
+
+def _load_courses(root: Path) -> List[str]:
+    p = root / "courses.json"
+    if p.exists():
+        with p.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    return []
+
+def _save_courses(root: Path, courses: List[str]):
+    with (root / "courses.json").open("w", encoding="utf-8") as f:
+        json.dump(courses, f, ensure_ascii=False)
+
+def _columns(records: List[Dict], courses: List[str]) -> Dict[str, np.ndarray]:
+    """Records -> column arrays; unseen course names are appended to `courses`."""
+    index = {c: i for i, c in enumerate(courses)}
+    cols = {k: np.empty(len(records), dtype=dt) for k, dt in COLUMNS.items()}
+    for i, t in enumerate(records):
+        course = t.get("course")
+        if course and course not in index:
+            index[course] = len(courses)
+            courses.append(course)
+        cols["priority"][i] = t.get("priority", 1)
+        cols["duration_min"][i] = t.get("duration_min") or 0
+        spent = t.get("spent_min")
+        cols["spent_min"][i] = NO_TIME if spent is None else spent
+        cols["created"][i] = _secs(t.get("created"))
+        cols["completed"][i] = _secs(t.get("completed_at"))
+        cols["due"][i] = _secs(t.get("due"))
+        cols["course_id"][i] = index[course] if course else NO_COURSE
+    return cols
+
+def _read_tail(root: Path) -> List[Dict]:
+    p = _tail_path(root)
+    if not p.exists():
+        return []
+    with p.open("r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def _seal(root: Path, records: List[Dict]):
+    courses = _load_courses(root)
+    cols = _columns(records, courses)
+    n = len(_segments(root)) + 1
+    np.savez(root / f"seg_{n:05d}.npz", **cols)
+    _save_courses(root, courses)
+    _tail_path(root).rename(root / f"seg_{n:05d}.jsonl")
+
+@traced("archive.append")
+def append(tasks: Iterable[Dict], root: Path = ARCHIVE_DIR):
+    """Append completed task records; seals the tail into a segment when it fills up."""
+    root.mkdir(exist_ok=True)
+    with _tail_path(root).open("a", encoding="utf-8") as f:
+        for t in tasks:
+            f.write(json.dumps(t, ensure_ascii=False) + "\n")
+    with _tail_path(root).open("rb") as f:
+        rows = sum(1 for _ in f)
+    if rows >= SEGMENT_ROWS:
+        _seal(root, _read_tail(root))
+
+# ---------------------------- Reading ----------------------------
+@traced("archive.load")
+def load_columns(root: Path = ARCHIVE_DIR):
+    """All archived rows as one dict of column arrays, plus the course names."""
+    courses = _load_courses(root)
+    parts = []
+    for seg in _segments(root):
+        with np.load(seg) as z:
+            parts.append({k: z[k] for k in COLUMNS})
+    tail = _read_tail(root)
+    if tail:
+        parts.append(_columns(tail, courses))  # names only extended in memory
+    if not parts:
+        return {k: np.empty(0, dtype=dt) for k, dt in COLUMNS.items()}, courses
+    return {k: np.concatenate([p[k] for p in parts]) for k in COLUMNS}, courses
+
+@traced("archive.stats")
+def compute_stats(cols: Dict[str, np.ndarray], courses: List[str], weeks: int = 8,
+                  now: Optional[datetime] = None) -> Dict:
+    done = cols["completed"]
+    stats: Dict = {"total": int(done.size)}
+
+    # throughput: Monday-based week buckets (1970-01-01 was a Thursday, hence +3 days),
+    # a fixed run of `weeks` ending with the current one so quiet weeks show as 0
+    valid = done != NO_TIME
+    week_idx = (done[valid] // 86400 + 3) // 7
+    last = (_secs((now or datetime.now()).isoformat()) // 86400 + 3) // 7
+    weeks = max(int(weeks), 1)
+    first = last - weeks + 1
+    in_range = week_idx[(week_idx >= first) & (week_idx <= last)]
+    counts = np.bincount(in_range - first, minlength=weeks)
+    stats["weekly"] = [(first + i, int(c)) for i, c in enumerate(counts)]
+
+    # lateness vs due (hours; positive = finished after the deadline)
+    has_due = valid & (cols["due"] != NO_TIME)
+    late_h = (done[has_due] - cols["due"][has_due]) / 3600.0
+    stats["with_due"] = int(late_h.size)
+    stats["mean_lateness_h"] = float(late_h.mean()) if late_h.size else None
+    stats["late_share"] = float((late_h > 0).mean()) if late_h.size else None
+
+    # estimated vs actual minutes per course (bincount = grouped sum)
+    cid = cols["course_id"].astype(np.int64) + 1         # shift NO_COURSE (-1) to bucket 0
+    nb = len(courses) + 1
+    n = np.bincount(cid, minlength=nb)
+    est = np.bincount(cid, weights=cols["duration_min"], minlength=nb)
+    spent_mask = cols["spent_min"] != NO_TIME
+    n_spent = np.bincount(cid[spent_mask], minlength=nb)
+    spent = np.bincount(cid[spent_mask], weights=cols["spent_min"][spent_mask], minlength=nb)
+    est_spent = np.bincount(cid[spent_mask], weights=cols["duration_min"][spent_mask], minlength=nb)
+    rows = []
+    for b in np.nonzero(n)[0]:
+        rows.append({
+            "course": courses[b - 1] if b else None,
+            "tasks": int(n[b]),
+            "mean_est_min": float(est[b] / n[b]),
+            "with_actual": int(n_spent[b]),
+            "mean_actual_min": float(spent[b] / n_spent[b]) if n_spent[b] else None,
+            "actual_vs_est": float(spent[b] / est_spent[b]) if n_spent[b] and est_spent[b] else None,
+        })
+    stats["courses"] = sorted(rows, key=lambda r: -r["tasks"])
+    return stats
+
+def week_start(week_idx: int) -> str:
+    """Inverse of the week bucketing above -> 'YYYY-MM-DD' of that Monday."""
+    days = int(week_idx) * 7 - 3
+    return np.datetime_as_string(np.datetime64(days, "D"))
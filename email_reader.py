@@ -1,9 +1,12 @@
 # email_reader.py
-import imaplib, email
+import imaplib, email, os
 from typing import List, Tuple
 
-IMAP_HOST = "imap.gmail.com"
-IMAP_PORT = 993
+from tracing import span, count
+
+IMAP_HOST = os.getenv("IMAP_HOST", "imap.gmail.com")
+IMAP_PORT = int(os.getenv("IMAP_PORT", "993"))
+IMAP_SSL  = os.getenv("IMAP_SSL", "1") != "0"   # plain IMAP only for local test servers
 
 def _body_from_message(msg) -> str:
     if msg.is_multipart():
@@ -22,19 +25,24 @@ def _body_from_message(msg) -> str:
 
 def fetch_recent_emails(email_addr: str, app_password: str, limit: int = 25) -> Tuple[List[str], List[str]]:
     subjects, bodies = [], []
-    M = imaplib.IMAP4_SSL(IMAP_HOST, IMAP_PORT)
-    M.login(email_addr, app_password)   # 16-char Google App Password (no spaces)
-    M.select("INBOX")
-    typ, data = M.search(None, 'ALL')
+    with span("imap.connect"):
+        M = imaplib.IMAP4_SSL(IMAP_HOST, IMAP_PORT) if IMAP_SSL else imaplib.IMAP4(IMAP_HOST, IMAP_PORT)
+        M.login(email_addr, app_password)   # 16-char Google App Password (no spaces)
+        M.select("INBOX")
+    with span("imap.search"):
+        typ, data = M.search(None, 'ALL')
     if typ != "OK": 
         return subjects, bodies
     ids = data[0].split()[-limit:]
     for i in ids[::-1]:
-        typ, msg_data = M.fetch(i, '(RFC822)')
+        with span("imap.fetch"):
+            typ, msg_data = M.fetch(i, '(RFC822)')
         if typ != "OK": continue
         raw = msg_data[0][1]
-        msg = email.message_from_bytes(raw)
-        subjects.append(msg.get("Subject", ""))
-        bodies.append(_body_from_message(msg))
+        count("imap.messages"); count("imap.bytes", len(raw))
+        with span("imap.decode"):
+            msg = email.message_from_bytes(raw)
+            subjects.append(msg.get("Subject", ""))
+            bodies.append(_body_from_message(msg))
     M.close(); M.logout()
     return subjects, bodies
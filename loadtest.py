@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# loadtest.py — offline load test of the sync pipeline against local stand-ins
+#
+# Starts, on 127.0.0.1:
+#   - an IMAP server whose INBOX is seeded with synthetic course emails
+#   - an SMTP sink that accepts (and counts) every message
+#   - an HTTP server with portal pages, large ICS feeds and a chat-completions stub
+# then runs  IMAP -> parse (rules + LLM) -> portal pages -> ICS feeds -> email summary
+# for N simulated students at a given concurrency, and reports per-stage
+# throughput and p50/p95/p99 latency from the tracing spans.
+#
+#   python loadtest.py --students 200 --concurrency 16 --emails 3000 --llm-latency-ms 400
+
+from __future__ import annotations
+import argparse, json, os, random, socketserver, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.mime.text import MIMEText
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import tracing
+from tracing import span
+
+COURSES = ["Calculus I", "Physics 101", "Organic Chemistry", "Data Structures", "Turkish History", "Linear Algebra"]
+KINDS = ["midterm", "quiz", "exam", "class", "lecture", "meeting"]
+ROOMS = ["Room B12", "Hall A", "Block C 204", "Lab 3"]
+
+# ---------------------------- Synthetic data ----------------------------
+def make_emails(n: int, base_url: str, portals: int, feeds: int, seed: int = 7) -> list[bytes]:
+    rnd = random.Random(seed)
+    now = datetime.now()
+    out = []
+    for i in range(n):
+        course = rnd.choice(COURSES)
+        kind = rnd.choice(KINDS)
+        when = now + timedelta(days=rnd.randint(1, 60), hours=rnd.randint(0, 10))
+        due = now + timedelta(days=rnd.randint(1, 60))
+        lines = [
+            f"Dear students of {course},",
+            f"The {kind} on {when.strftime('%b %d')} at {when.strftime('%H:%M')} in {rnd.choice(ROOMS)}.",
+            f"Homework deadline due on {due.strftime('%Y-%m-%d')} 23:59.",
+            f"Materials: {base_url}/lms.course/{rnd.randrange(portals)}",
+        ]
+        if i % 10 == 0:
+            lines.append(f"Subscribe to the course calendar: {base_url}/calendar/{rnd.randrange(feeds)}.ics")
+        msg = MIMEText("\n".join(lines), "plain", "utf-8")
+        msg["Subject"] = f"[{course}] {kind.title()} update #{i}"
+        msg["From"] = "noreply@university.edu.tr"
+        msg["To"] = "student@example.com"
+        out.append(msg.as_bytes())
+    return out
+
+def make_ics(n_events: int, seed: int) -> str:
+    rnd = random.Random(seed)
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    rows = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//pairent-loadtest//EN"]
+    for i in range(n_events):
+        s = start + timedelta(hours=rnd.randint(0, 24 * 90))
+        rows += ["BEGIN:VEVENT", f"UID:{seed}-{i}@loadtest",
+                 f"DTSTART:{s.strftime('%Y%m%dT%H%M%SZ')}",
+                 f"DTEND:{(s + timedelta(minutes=50)).strftime('%Y%m%dT%H%M%SZ')}",
+                 f"SUMMARY:{rnd.choice(COURSES)} class", f"LOCATION:{rnd.choice(ROOMS)}", "END:VEVENT"]
+    rows.append("END:VCALENDAR")
+    return "\r\n".join(rows) + "\r\n"
+
+def make_portal_page(i: int) -> str:
+    items = "".join(f"<li>Week {w}: {COURSES[(i + w) % len(COURSES)]} exam schedule and deadline notes</li>"
+                    for w in range(1, 15))
+    return f"<html><head><title>Portal {i}</title></head><body><h1>Course schedule</h1><ul>{items}</ul></body></html>"
+
+# ---------------------------- IMAP stand-in ----------------------------
+class _IMAPHandler(socketserver.StreamRequestHandler):
+    """Just enough IMAP4rev1 for imaplib: CAPABILITY, LOGIN, SELECT, SEARCH, FETCH, CLOSE, LOGOUT."""
+    disable_nagle_algorithm = True   # else small replies stall ~40ms on delayed ACKs
+
+    def _send(self, line: str):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        box = self.server.mailbox
+        self._send("* OK pairent-loadtest IMAP4rev1 ready")
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            parts = raw.decode(errors="replace").strip().split(" ", 2)
+            tag, cmd = parts[0], (parts[1].upper() if len(parts) > 1 else "")
+            arg = parts[2] if len(parts) > 2 else ""
+            if cmd == "CAPABILITY":
+                self._send("* CAPABILITY IMAP4rev1")
+            elif cmd == "SELECT":
+                self._send(f"* {len(box)} EXISTS")
+                self._send("* 0 RECENT")
+                self._send(f"{tag} OK [READ-WRITE] SELECT completed")
+                continue
+            elif cmd == "SEARCH":
+                self._send("* SEARCH " + " ".join(str(i) for i in range(1, len(box) + 1)))
+            elif cmd == "FETCH":
+                num = int(arg.split(" ", 1)[0])
+                body = box[num - 1]
+                self.wfile.write(f"* {num} FETCH (RFC822 {{{len(body)}}}\r\n".encode() + body + b")\r\n")
+            elif cmd == "LOGOUT":
+                self._send("* BYE logging out")
+                self._send(f"{tag} OK LOGOUT completed")
+                return
+            elif cmd not in ("LOGIN", "CLOSE", "NOOP"):
+                self._send(f"{tag} BAD unsupported command {cmd}")
+                continue
+            self._send(f"{tag} OK {cmd} completed")
+
+class _ThreadingTCP(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+# ---------------------------- SMTP sink ----------------------------
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Accepts EHLO / AUTH PLAIN / MAIL / RCPT / DATA / QUIT and drops the message."""
+    disable_nagle_algorithm = True
+
+    def _send(self, line: str):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self._send("220 pairent-loadtest ESMTP")
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            cmd = raw.decode(errors="replace").strip().split(" ", 1)[0].upper()
+            if cmd in ("EHLO", "HELO"):
+                self._send("250-pairent-loadtest")
+                self._send("250 AUTH PLAIN")
+            elif cmd == "AUTH":
+                self._send("235 2.7.0 Authentication successful")
+            elif cmd == "DATA":
+                self._send("354 End data with <CR><LF>.<CR><LF>")
+                size = 0
+                for line in self.rfile:
+                    if line in (b".\r\n", b".\n"):
+                        break
+                    size += len(line)
+                with self.server.lock:
+                    self.server.received += 1
+                    self.server.bytes += size
+                self._send("250 2.0.0 queued")
+            elif cmd == "QUIT":
+                self._send("221 2.0.0 bye")
+                return
+            else:  # MAIL, RCPT, RSET, NOOP
+                self._send("250 2.0.0 OK")
+
+# ---------------------------- HTTP: portals, ICS, LLM ----------------------------
+class _HTTPHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *_):
+        pass
+
+    def _reply(self, code: int, body: bytes, ctype: str):
+        self.send_response(code)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        srv = self.server
+        time.sleep(srv.http_latency)
+        if self.path.startswith("/lms.course/"):
+            self._reply(200, srv.page(int(self.path.rsplit("/", 1)[1])), "text/html; charset=utf-8")
+        elif self.path.startswith("/calendar/") and self.path.endswith(".ics"):
+            self._reply(200, srv.feed(int(self.path.rsplit("/", 1)[1][:-4])), "text/calendar; charset=utf-8")
+        else:
+            self._reply(404, b"not found", "text/plain")
+
+    def do_POST(self):
+        srv = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self.path.endswith("/chat/completions"):
+            self._reply(404, b"{}", "application/json")
+            return
+        time.sleep(srv.llm_latency)
+        req = json.loads(body or b"{}")
+        when = (datetime.now(timezone.utc) + timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        content = json.dumps({"events": [{"type": "exam", "title": "Stub exam", "when": when,
+                                          "location": "Hall A", "notes": "from llm stub"}]})
+        if req.get("response_format", {}).get("type") != "json_object":
+            content = "# Plan\n- study"
+        resp = {"id": "chatcmpl-loadtest", "object": "chat.completion", "created": int(time.time()),
+                "model": req.get("model", "stub"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}}
+        self._reply(200, json.dumps(resp).encode(), "application/json")
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr, ics_events: int, http_latency: float, llm_latency: float):
+        super().__init__(addr, _HTTPHandler)
+        self.ics_events, self.http_latency, self.llm_latency = ics_events, http_latency, llm_latency
+        self._cache: dict = {}
+        self._cache_lock = threading.Lock()
+
+    def _cached(self, key, make):
+        with self._cache_lock:
+            if key not in self._cache:
+                self._cache[key] = make()
+            return self._cache[key]
+
+    def page(self, i: int) -> bytes:
+        return self._cached(("page", i), lambda: make_portal_page(i).encode())
+
+    def feed(self, i: int) -> bytes:
+        return self._cached(("ics", i), lambda: make_ics(self.ics_events, i).encode())
+
+# ---------------------------- Harness ----------------------------
+class FakeServices:
+    """Starts all stand-ins on free local ports and points the app modules at them."""
+
+    def __init__(self, emails: int, ics_events: int, portals: int, feeds: int,
+                 http_latency_ms: float, llm_latency_ms: float):
+        self.http = _HTTPServer(("127.0.0.1", 0), ics_events, http_latency_ms / 1000.0, llm_latency_ms / 1000.0)
+        self.base_url = f"http://127.0.0.1:{self.http.server_address[1]}"
+        self.imap = _ThreadingTCP(("127.0.0.1", 0), _IMAPHandler)
+        self.imap.mailbox = make_emails(emails, self.base_url, portals, feeds)
+        self.smtp = _ThreadingTCP(("127.0.0.1", 0), _SMTPHandler)
+        self.smtp.lock, self.smtp.received, self.smtp.bytes = threading.Lock(), 0, 0
+
+    def __enter__(self):
+        for srv in (self.http, self.imap, self.smtp):
+            threading.Thread(target=srv.serve_forever, daemon=True).start()
+        import email_reader, notifier
+        email_reader.IMAP_HOST, email_reader.IMAP_PORT, email_reader.IMAP_SSL = "127.0.0.1", self.imap.server_address[1], False
+        notifier.SMTP_HOST, notifier.SMTP_PORT, notifier.SMTP_STARTTLS = "127.0.0.1", self.smtp.server_address[1], False
+        os.environ["OPENAI_BASE_URL"] = self.base_url + "/v1"
+        os.environ["OPENAI_API_KEY"] = "sk-loadtest"
+        return self
+
+    def __exit__(self, *exc):
+        for srv in (self.http, self.imap, self.smtp):
+            srv.shutdown()
+            srv.server_close()
+        return False
+
+def run_pipeline(student: int, limit: int):
+    """One student's sync: the same calls app.py / scheduler.py make, plus portals, ICS and a summary email."""
+    from email_reader import fetch_recent_emails
+    from ai_parser import extract_events_from_texts
+    from portal_scraper import fetch_portal_texts
+    from portal_detector import discover_ics_links_from_emails
+    from portal_fetcher import fetch_ics_events
+    from notifier import send_email
+
+    user = f"student{student}@example.com"
+    with span("pipeline"):
+        with span("stage.imap"):
+            subjects, bodies = fetch_recent_emails(user, "loadtest-app-pass", limit=limit)
+        with span("stage.parse"):
+            events = extract_events_from_texts(bodies + subjects)
+        with span("stage.portal"):
+            fetch_portal_texts(bodies)
+        with span("stage.ics"):
+            tz = datetime.now().astimezone().tzinfo
+            for url in discover_ics_links_from_emails(bodies):
+                events += fetch_ics_events(url, tz)
+        with span("stage.notify"):
+            rows = "".join(f"<tr><td>{e.get('when','')}</td><td>{e.get('title','')}</td></tr>" for e in events[:200])
+            send_email(user, "loadtest-app-pass", user, "Your schedule — Pairent", f"<table>{rows}</table>")
+
+def _pct(sorted_ms: list[float], q: float) -> float:
+    if not sorted_ms:
+        return 0.0
+    k = min(len(sorted_ms) - 1, max(0, int(round(q * (len(sorted_ms) - 1)))))
+    return sorted_ms[k]
+
+def summarize(wall: float) -> list[dict]:
+    by_name: dict = {}
+    for s in tracing.spans():
+        by_name.setdefault(s["name"], []).append(s)
+    rows = []
+    for name, ss in by_name.items():
+        ms = sorted(s["ms"] for s in ss)
+        rows.append({"stage": name, "count": len(ms), "errors": sum(1 for s in ss if s["error"]),
+                     "per_sec": len(ms) / wall if wall else 0.0,
+                     "p50_ms": _pct(ms, .50), "p95_ms": _pct(ms, .95), "p99_ms": _pct(ms, .99), "max_ms": ms[-1]})
+    # pipeline + stages first, inner spans after, each group by total time
+    rows.sort(key=lambda r: (not (r["stage"] == "pipeline" or r["stage"].startswith("stage.")), -r["p50_ms"] * r["count"]))
+    return rows
+
+def build_parser():
+    p = argparse.ArgumentParser(prog="loadtest", description="Offline load test of the Pairent sync pipeline")
+    p.add_argument("--students", type=int, default=50, help="Pipelines to run in total")
+    p.add_argument("--concurrency", type=int, default=8, help="Pipelines in flight at once")
+    p.add_argument("--emails", type=int, default=2000, help="Synthetic emails in the IMAP inbox")
+    p.add_argument("--limit", type=int, default=25, help="Emails each pipeline fetches (like the app)")
+    p.add_argument("--portals", type=int, default=20, help="Distinct portal pages linked from emails")
+    p.add_argument("--feeds", type=int, default=3, help="Distinct ICS feeds linked from emails")
+    p.add_argument("--ics-events", type=int, default=300, help="Events per ICS feed")
+    p.add_argument("--http-latency-ms", type=float, default=20, help="Added latency per portal/ICS request")
+    p.add_argument("--llm-latency-ms", type=float, default=300, help="Added latency per chat completion")
+    p.add_argument("--json", metavar="FILE", help="Write the report rows as JSON")
+    p.add_argument("--spans", metavar="FILE", help="Write raw spans as JSON lines")
+    return p
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    print(f"[LOADTEST] seeding {args.emails} emails, {args.feeds} feeds x {args.ics_events} events ...", file=sys.stderr)
+    with FakeServices(args.emails, args.ics_events, args.portals, args.feeds,
+                      args.http_latency_ms, args.llm_latency_ms) as svc:
+        tracing.enable(track_alloc=False)
+        tracing.reset()
+        failures = []
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            futs = [pool.submit(run_pipeline, i, args.limit) for i in range(args.students)]
+            for f in futs:
+                try:
+                    f.result()
+                except Exception as e:
+                    failures.append(repr(e))
+        wall = time.perf_counter() - t0
+        rows = summarize(wall)
+        sent = svc.smtp.received
+
+    print(f"=== LOADTEST: {args.students} pipelines @ concurrency {args.concurrency} in {wall:.2f}s "
+          f"({args.students / wall:.2f}/s), {len(failures)} failed, {sent} emails sunk ===")
+    print(f"{'stage':22} {'count':>7} {'per s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'err':>4}")
+    for r in rows:
+        print(f"{r['stage'][:22]:22} {r['count']:>7} {r['per_sec']:>8.1f} {r['p50_ms']:>9.1f} "
+              f"{r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['max_ms']:>9.1f} {r['errors']:>4}")
+    cs = tracing.counters()
+    if cs:
+        print("--- counters ---")
+        for k, v in sorted(cs.items()):
+            print(f"{k:22} {v:>10}")
+    for msg in sorted(set(failures))[:5]:
+        print("[FAILED]", msg)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"wall_s": wall, "students": args.students, "concurrency": args.concurrency,
+                       "failures": len(failures), "stages": rows}, f, indent=2)
+    if args.spans:
+        tracing.export_jsonl(args.spans)
+    tracing.disable()
+
+if __name__ == "__main__":
+    main()
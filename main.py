@@ -2,16 +2,24 @@
 # AI Student Planner (CLI) — natural language tasks -> daily/weekly/monthly plan
 # No web UI. Uses JSON storage + dateparser. Single-file, fast.
 
-import json, re, sys, argparse, uuid
+import json, re, sys, argparse, uuid, csv, io
 from pathlib import Path
+from functools import lru_cache
 from datetime import datetime, timedelta, time
 import dateparser
 
+import tracing
+from tracing import span, traced
+
 DATA_FILE = Path(__file__).with_name("planner_data.json")
 WORK_START = time(9, 0)     # start of planning day
 WORK_END   = time(21, 0)    # end of planning day
 DEFAULT_BLOCK_MIN = 60      # default study block minutes
 DEFAULT_BREAK_MIN = 10      # short break between blocks
+MIN_BLOCK_MIN = 30          # never split a task into pieces shorter than this
+MAX_BLOCK_MIN = 120         # longest single sitting before a task is split
+DEFAULT_EVENT_MIN = 60      # busy time assumed for synced events without an end
+EVENTS_FILE = Path(__file__).with_name("data") / "events.json"   # scheduler.py's event store
 
 PRIORITY_MAP = {"urgent": 3, "high": 2, "medium": 1, "low": 0}
 LEVEL_TO_TEXT = {3:"urgent",2:"high",1:"medium",0:"low"}
@@ -20,12 +28,14 @@ LEVEL_TO_TEXT = {3:"urgent",2:"high",1:"medium",0:"low"}
 def _now():
     return datetime.now()
 
+@traced("store.load")
 def load_data():
     if DATA_FILE.exists():
         with DATA_FILE.open("r", encoding="utf-8") as f:
             return json.load(f)
     return {"tasks": [], "completed": []}
 
+@traced("store.save")
 def save_data(data):
     with DATA_FILE.open("w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
@@ -41,12 +51,18 @@ def parse_duration_minutes(text, default=DEFAULT_BLOCK_MIN):
     unit = m.group("Unit").lower()
     return int(val*60) if unit.startswith('h') else int(val)
 
+@lru_cache(maxsize=4096)
+def _parse_date_phrase(phrase):
+    # dateparser dominates add/import time and batches repeat the same phrases;
+    # relative dates resolve against process start, which is fine for a CLI run
+    return dateparser.parse(phrase, settings={"PREFER_DATES_FROM": "future"})
+
 def parse_due(text):
     # Try to detect explicit due date/time; fallback None
     # Examples: "tomorrow 5pm", "by Friday", "due 20 Oct 14:00"
     candidates = []
     for chunk in re.findall(r'(by|due|on|at|before)?\s*[^,.;]*', text, re.I):
-        dt = dateparser.parse(chunk, settings={"PREFER_DATES_FROM": "future"})
+        dt = _parse_date_phrase(chunk)
         if dt: candidates.append(dt)
     return min(candidates) if candidates else None
 
@@ -65,46 +81,276 @@ def infer_course(text):
         return m.group(2).strip().split(",")[0][:40]
     return None
 
-# ---------------------------- Commands ----------------------------
-def cmd_add(args):
-    data = load_data()
-    text = args.text
-    task = {
+def _text_field(value, name):
+    # imported rows can carry numbers (JSON/YAML-ish sources); anything else is a bad row
+    if value is None or isinstance(value, str):
+        return (value or "").strip()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise ValueError(f"{name!r} must be a string or number, got {type(value).__name__}")
+
+def make_task(text, notes="", course=None, duration=None, priority=None, due=None):
+    """Build a task from natural language; explicit fields (as strings) override inference.
+    Raises ValueError with a readable message when something doesn't validate."""
+    text = _text_field(text, "text")
+    notes = _text_field(notes, "notes")
+    course = _text_field(course, "course") or None
+    if not text:
+        raise ValueError("empty task text")
+    if duration in (None, ""):
+        duration_min = parse_duration_minutes(text)
+    elif str(duration).strip().isdigit():
+        duration_min = int(duration)
+    else:
+        duration_min = parse_duration_minutes(str(duration), default=None)
+        if duration_min is None:
+            raise ValueError(f"bad duration {duration!r}")
+    if duration_min <= 0:
+        raise ValueError(f"duration must be positive, got {duration_min}")
+    if priority in (None, ""):
+        level = infer_priority(text)
+    elif str(priority).strip().lower() in PRIORITY_MAP:
+        level = PRIORITY_MAP[str(priority).strip().lower()]
+    elif str(priority).strip() in ("0", "1", "2", "3"):
+        level = int(priority)
+    else:
+        raise ValueError(f"bad priority {priority!r} (use {'/'.join(PRIORITY_MAP)} or 0-3)")
+    if due in (None, ""):
+        due_dt = parse_due(text)
+    else:
+        due_dt = _parse_date_phrase(str(due).strip())
+        if due_dt is None:
+            raise ValueError(f"could not understand due date {due!r}")
+    if due_dt is not None and due_dt.tzinfo:
+        # "18:00 +03:00" etc.: the store holds naive local times (see _local)
+        due_dt = due_dt.astimezone().replace(tzinfo=None)
+    return {
         "id": str(uuid.uuid4())[:8],
-        "title": text.strip(),
-        "course": infer_course(text),
-        "duration_min": parse_duration_minutes(text),
-        "priority": infer_priority(text),
-        "due": parse_due(text).isoformat() if parse_due(text) else None,
+        "title": text,
+        "course": course or infer_course(text),
+        "duration_min": duration_min,
+        "priority": level,
+        "due": due_dt.isoformat() if due_dt else None,
         "created": _now().isoformat(),
-        "notes": args.notes
+        "notes": notes or ""
     }
+
+# ---------------------------- Commands ----------------------------
+def cmd_add(args):
+    try:
+        task = make_task(args.text, notes=args.notes)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return
+    data = load_data()
     data["tasks"].append(task)
     save_data(data)
     print(f"[ADDED] {task['id']} • {task['title']} • {LEVEL_TO_TEXT[task['priority']]} • {task['duration_min']}m" +
           (f" • due {task['due']}" if task['due'] else ""))
 
+# ---- bulk import ----
+IMPORT_FIELDS = ("text", "notes", "course", "duration", "priority", "due")
+
+def _read_import_rows(src, fmt):
+    """Yield ((kind, n), fields) from a lines/CSV/JSON source, where kind is "line"
+    (or "item" for a JSON array element). `fields` is a dict of IMPORT_FIELDS (or an
+    error string, reported like any other bad row)."""
+    raw = src.read().lstrip("\ufeff")  # Excel's UTF-8 BOM (stdin isn't opened as utf-8-sig)
+    if fmt == "auto":
+        name = getattr(src, "name", "")
+        head = raw.lstrip()[:1]
+        fmt = ("csv" if name.endswith(".csv") else
+               "json" if name.endswith((".json", ".jsonl")) or head in ("[", "{") else "lines")
+    if fmt == "lines":
+        for n, line in enumerate(raw.splitlines(), 1):
+            if line.strip() and not line.lstrip().startswith("#"):
+                yield ("line", n), {"text": line}
+    elif fmt == "csv":
+        reader = csv.DictReader(io.StringIO(raw))
+        for row in reader:
+            extra = row.pop(None, None)  # DictReader's restkey for fields past the header
+            if extra:
+                yield ("line", reader.line_num), f"{len(extra)} more field(s) than the header"
+                continue
+            row = {(k or "").strip().lower(): (v or "").strip() for k, v in row.items()}
+            row.setdefault("text", row.pop("title", ""))
+            yield ("line", reader.line_num), {k: row.get(k) for k in IMPORT_FIELDS}
+    else:
+        stripped = raw.strip()
+        whole = None
+        if stripped.startswith("["):
+            whole = json.loads(stripped)
+        elif stripped.startswith("{"):
+            try:  # one (possibly pretty-printed) object, else JSON lines below
+                whole = [json.loads(stripped)]
+            except json.JSONDecodeError:
+                pass
+        if whole is not None:
+            items = [(("item", n), obj) for n, obj in enumerate(whole, 1)]
+        else:  # JSON lines
+            items = []
+            for n, line in enumerate(raw.splitlines(), 1):
+                if not line.strip():
+                    continue
+                try:
+                    items.append((("line", n), json.loads(line)))
+                except json.JSONDecodeError as e:
+                    yield ("line", n), f"invalid JSON ({e.msg})"
+        for n, obj in items:
+            if isinstance(obj, str):
+                obj = {"text": obj}
+            if not isinstance(obj, dict):
+                yield n, f"unsupported row {obj!r}"
+                continue
+            obj = dict(obj)
+            obj.setdefault("text", obj.pop("title", ""))
+            yield n, {k: obj.get(k) for k in IMPORT_FIELDS}
+
+def _import_row(item):
+    # top-level so it can run in a worker process
+    n, fields = item
+    if isinstance(fields, str):
+        return n, None, fields
+    try:
+        return n, make_task(**fields), None
+    except ValueError as e:
+        return n, None, str(e)
+
+def cmd_import(args):
+    try:
+        src = sys.stdin if args.file == "-" else open(args.file, "r", encoding="utf-8-sig", newline="")
+    except OSError as e:
+        print(f"[ERROR] could not read {args.file}: {e.strerror or e}")
+        return
+    with src:
+        try:
+            rows = list(_read_import_rows(src, args.format))
+        except (json.JSONDecodeError, csv.Error, OSError, UnicodeDecodeError) as e:
+            print(f"[ERROR] could not read {args.file}: {e}")
+            return
+    with span("import.parse", rows=len(rows), jobs=args.jobs):
+        if args.jobs > 1 and len(rows) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+                results = list(pool.map(_import_row, rows, chunksize=max(1, len(rows) // (args.jobs * 4))))
+        else:
+            results = [_import_row(r) for r in rows]
+
+    results.sort(key=lambda r: r[0])
+    tasks = [t for _, t, _ in results if t]
+    errors = [(n, err) for n, _, err in results if err]
+    for (kind, n), err in errors:
+        print(f"[ERROR] {kind} {n}: {err}")
+    if errors and args.strict:
+        print(f"[ABORTED] {len(errors)} bad row(s); nothing imported (--strict).")
+        return
+    if tasks and not args.dry_run:
+        data = load_data()
+        data["tasks"].extend(tasks)
+        save_data(data)  # one write for the whole batch
+    verb = "VALIDATED" if args.dry_run else "IMPORTED"
+    print(f"[{verb}] {len(tasks)} task(s)" + (f", {len(errors)} error(s)" if errors else ""))
+
+def _task_order(t):
+    # priority desc, then due soonest, then created
+    due = _parse_dt(t["due"]) if t["due"] else datetime.max
+    return (-t["priority"], due, t["created"])
+
+def _print_tasks(tasks):
+    _print_rows(sorted(tasks, key=_task_order))
+
+def _print_rows(tasks):
+    for t in tasks:
+        due = _parse_dt(t["due"]).strftime("%Y-%m-%d %H:%M") if t["due"] else "-"
+        print(f"{t['id']} | {LEVEL_TO_TEXT[t['priority']]:6} | {t['duration_min']:>3}m | due: {due} | {t['title']}")
+
 def cmd_list(_args):
     data = load_data()
     if not data["tasks"]:
         print("No open tasks.")
         return
-    # sort by priority desc, then by due soonest, then created
-    def sort_key(t):
-        due = dateparser.parse(t["due"]) if t["due"] else datetime.max
-        return (-t["priority"], due, t["created"])
-    for t in sorted(data["tasks"], key=sort_key):
-        due = dateparser.parse(t["due"]).strftime("%Y-%m-%d %H:%M") if t["due"] else "-"
-        print(f"{t['id']} | {LEVEL_TO_TEXT[t['priority']]:6} | {t['duration_min']:>3}m | due: {due} | {t['title']}")
+    _print_tasks(data["tasks"])
+
+def cmd_search(args):
+    def bound(s, end_of_day):
+        if not s:
+            return None
+        dt = _parse_date_phrase(s.strip())
+        if dt is None:
+            raise SystemExit(f"[ERROR] could not understand date {s!r}")
+        if end_of_day and re.fullmatch(r"\d{4}-\d{2}-\d{2}", s.strip()):
+            dt = datetime.combine(dt.date(), time.max)  # a bare date means the whole day
+        return dt.isoformat()
+
+    due_after, due_before = bound(args.due_after, False), bound(args.due_before, True)
+    import task_index  # numpy; only needed here
+    stamp = task_index.store_stamp(DATA_FILE)
+    data = load_data()
+    if task_index.store_stamp(DATA_FILE) != stamp:
+        stamp = None  # rewritten while we read it: don't trust or save an index for it
+    tasks = data["tasks"]
+    with span("search.index", tasks=len(tasks)) as sp:
+        path = task_index.index_path(DATA_FILE)
+        index = task_index.TaskIndex.load(path, stamp, len(tasks))
+        if index is None:  # first search since the store was last written
+            index = task_index.TaskIndex.build(tasks)
+            sp.set(built=True)
+            if stamp is not None:
+                index.save(path, stamp)
+    with span("search.query"):
+        pos = index.search(text=args.text, course=args.course, due_after=due_after, due_before=due_before)
+        hits = list(tasks) if pos is None else [tasks[p] for p in pos.tolist()]
+    if not hits:
+        print("No matching tasks.")
+        return
+    hits.sort(key=_task_order)  # only the hits; --limit keeps the top of this order
+    _print_rows(hits[:args.limit] if args.limit else hits)
+    if args.limit and len(hits) > args.limit:
+        print(f"... {len(hits) - args.limit} more")
 
 def cmd_delete(args):
     data = load_data()
-    before = len(data["tasks"])
-    data["tasks"] = [t for t in data["tasks"] if t["id"] != args.id]
+    idx = next((i for i,t in enumerate(data["tasks"]) if t["id"]==args.id), None)
+    if idx is None:
+        print("[NOT FOUND]")
+        return
+    t = data["tasks"].pop(idx)
     save_data(data)
-    print("[DELETED]" if len(data["tasks"]) < before else "[NOT FOUND]")
+    print("[DELETED]")
+
+def _parse_spent(text):
+    """`done --spent`: "90" means minutes, otherwise anything parse_duration_minutes takes."""
+    if re.fullmatch(r"\d+(\.\d+)?", text.strip()):
+        return int(float(text))
+    minutes = parse_duration_minutes(text, default=None)
+    if minutes is None:
+        raise ValueError(f'can\'t read --spent "{text}" (try "90", "90m" or "1.5h")')
+    return minutes
+
+def _archive_completed(data, done=()):
+    """Move finished tasks (`done` plus any legacy data["completed"] history) into the
+    archive. The store is written first, so a task is never open and archived at once;
+    if the archive write fails the records go back under "completed" for the next
+    done/stats to retry, and the OSError is re-raised."""
+    import archive  # numpy; only needed here and in stats
+    moved = data.get("completed", []) + list(done)
+    data["completed"] = []
+    save_data(data)
+    try:
+        archive.append(moved)
+    except OSError:
+        data["completed"] = moved
+        save_data(data)
+        raise
 
 def cmd_done(args):
+    spent = None
+    if args.spent:
+        try:
+            spent = _parse_spent(args.spent)
+        except ValueError as e:
+            print(f"[ERROR] {e}")
+            return
     data = load_data()
     idx = next((i for i,t in enumerate(data["tasks"]) if t["id"]==args.id), None)
     if idx is None:
@@ -112,10 +358,42 @@ def cmd_done(args):
         return
     t = data["tasks"].pop(idx)
     t["completed_at"] = _now().isoformat()
-    data["completed"].append(t)
-    save_data(data)
+    if spent is not None:
+        t["spent_min"] = spent
+    try:
+        _archive_completed(data, [t])
+    except OSError as e:
+        print(f"[ERROR] could not write the archive ({e}); {t['id']} is kept as completed and archived next time")
+        return
     print(f"[DONE] {t['id']} • {t['title']}")
 
+def cmd_stats(args):
+    import archive
+    data = load_data()
+    if data.get("completed"):  # history from before the archive existed
+        try:
+            _archive_completed(data)
+        except OSError as e:
+            print(f"[ERROR] could not write the archive: {e}")
+            return
+    cols, courses = archive.load_columns()
+    st = archive.compute_stats(cols, courses, weeks=args.weeks)
+    if not st["total"]:
+        print("No completed tasks yet.")
+        return
+    print(f"=== STATS: {st['total']} completed ===")
+    print(f"\nThroughput (last {args.weeks} weeks)")
+    for w, c in st["weekly"]:
+        print(f"  week of {archive.week_start(w)} | {c:>5} done")
+    if st["with_due"]:
+        print(f"\nLateness vs due ({st['with_due']} with a due date)")
+        print(f"  mean {st['mean_lateness_h']:+.1f}h | late {st['late_share']*100:.0f}%")
+    print("\nEstimated vs actual (per course)")
+    for r in st["courses"]:
+        actual = f"{r['mean_actual_min']:.0f}m" if r["mean_actual_min"] is not None else "-"
+        ratio = f"x{r['actual_vs_est']:.2f}" if r["actual_vs_est"] is not None else ""
+        print(f"  {(r['course'] or '(no course)')[:30]:30} | {r['tasks']:>5} tasks | est {r['mean_est_min']:.0f}m | actual {actual} {ratio}")
+
 # ---------------------------- Planning Core ----------------------------
 def daterange(start_date, end_date):
     d = start_date
@@ -138,116 +416,244 @@ def plan_window(period, start_str=None):
         end = start + timedelta(days=29)
     return start, end
 
-def day_slots(day):
-    # generate work slots between WORK_START and WORK_END
+def _parse_dt(s):
+    # stored values are ISO; dateparser only for anything hand-edited
+    try:
+        return datetime.fromisoformat(s)
+    except (TypeError, ValueError):
+        return dateparser.parse(s) if s else None
+
+def build_busy_index(intervals, start, end):
+    """Bucket busy (start, end) intervals by day -> sorted, merged list per day.
+    Intervals crossing midnight land in every day they touch; anything outside
+    [start, end] is dropped. O(B log B) for B intervals."""
+    index = {}
+    first, last = start.date(), end.date()
+    for s, e in intervals:
+        if e <= s:
+            continue
+        d = max(s.date(), first)
+        while d <= min(e.date(), last):
+            day0 = datetime.combine(d, time())
+            index.setdefault(d, []).append((max(s, day0), min(e, day0 + timedelta(days=1))))
+            d += timedelta(days=1)
+    for d, ivs in index.items():
+        ivs.sort()
+        merged = [ivs[0]]
+        for s, e in ivs[1:]:
+            if s <= merged[-1][1]:
+                if e > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], e)
+            else:
+                merged.append((s, e))
+        index[d] = merged
+    return index
+
+def day_slots(day, busy=()):
+    # work window between WORK_START and WORK_END, minus that day's busy intervals
     start_dt = datetime.combine(day.date(), WORK_START)
     end_dt = datetime.combine(day.date(), WORK_END)
-    return [(start_dt, end_dt)]
-
-def allocate(tasks, start, end):
-    # Greedy fit: priority desc, due soonest, then longest
-    def tkey(t):
-        due = dateparser.parse(t["due"]) if t["due"] else datetime.max
-        return (-t["priority"], due, -t["duration_min"])
-    tasks = sorted(tasks, key=tkey)
+    free, cur = [], start_dt
+    for s, e in busy:  # sorted + merged (build_busy_index)
+        if e <= cur:
+            continue
+        if s >= end_dt:
+            break
+        if s > cur:
+            free.append((cur, s))
+        cur = max(cur, e)
+    if cur < end_dt:
+        free.append((cur, end_dt))
+    return free
+
+@traced("plan.allocate")
+def allocate(tasks, start, end, busy=(), min_block=MIN_BLOCK_MIN, max_block=MAX_BLOCK_MIN):
+    """Place tasks into free time, earliest deadline first.
+    Long tasks are split into chunks of at most `max_block` minutes; no chunk is
+    shorter than `min_block` unless it is the task's last remainder. Tasks that don't
+    fit are left (partly) unplaced; see _plan_issues()."""
+    # above max_block/2 some lengths (max_block < d < max_block + min_block) can't be
+    # split into chunks that all reach min_block, and those tasks would never be placed
+    min_block = min(min_block, max_block // 2)
+    busy_index = build_busy_index(busy, start, end)
+
+    # EDF: due soonest, then priority desc, then longest; undated tasks go last
+    work = []
+    for t in tasks:
+        if t["duration_min"] <= 0:
+            continue
+        due = _parse_dt(t["due"]) if t["due"] else None
+        work.append([due or datetime.max, -t["priority"], -t["duration_min"], t, t["duration_min"]])
+    work.sort(key=lambda w: w[:3])
 
-    schedule = []  # list of blocks: {start,end,task_id,title}
+    schedule = []  # list of blocks: {start,end,task_id,title,course,priority}
     for day in daterange(start.date(), end.date()):
-        free_windows = day_slots(datetime.combine(day, time()))
-        # place tasks that must occur on/before this day
-        for task in [x for x in tasks if x["duration_min"] > 0]:
-            due_dt = dateparser.parse(task["due"]) if task["due"] else None
-            if due_dt and due_dt.date() < day:
-                # already missed; schedule today anyway
-                pass
-
-        i = 0
-        while i < len(tasks):
-            t = tasks[i]
-            if t["duration_min"] <= 0:
-                i += 1
-                continue
-
-            # If task has due date before this day ends, try to place today; else still place if room.
-            can_place_today = True
-            # Try to fit in first free window big enough
-            placed = False
-            dur = t["duration_min"]
+        free_windows = day_slots(datetime.combine(day, time()), busy_index.get(day, ()))
+        for w in work:
+            t, remaining = w[3], w[4]
             j = 0
-            while j < len(free_windows):
+            while remaining > 0 and j < len(free_windows):
                 win_start, win_end = free_windows[j]
                 available = int((win_end - win_start).total_seconds() // 60)
-                if available >= dur:
-                    block_start = win_start
-                    block_end = win_start + timedelta(minutes=dur)
-                    schedule.append({
-                        "start": block_start.isoformat(),
-                        "end": block_end.isoformat(),
-                        "task_id": t["id"],
-                        "title": t["title"],
-                        "course": t["course"],
-                        "priority": t["priority"]
-                    })
-                    # update window: consume + add a small break
-                    new_start = block_end + timedelta(minutes=DEFAULT_BREAK_MIN)
-                    if new_start < win_end:
-                        free_windows[j] = (new_start, win_end)
-                    else:
-                        free_windows.pop(j)
-                    # consume task
-                    t["duration_min"] = 0
-                    placed = True
-                    break
+                chunk = min(remaining, available, max_block)
+                if 0 < remaining - chunk < min_block:
+                    chunk = remaining - min_block  # leave a remainder worth sitting down for
+                if chunk < min(min_block, remaining):
+                    j += 1  # too small for this task; a shorter one may still use it
+                    continue
+                block_end = win_start + timedelta(minutes=chunk)
+                schedule.append({
+                    "start": win_start.isoformat(),
+                    "end": block_end.isoformat(),
+                    "task_id": t["id"],
+                    "title": t["title"],
+                    "course": t["course"],
+                    "priority": t["priority"]
+                })
+                remaining -= chunk
+                # update window: consume + add a small break
+                new_start = block_end + timedelta(minutes=DEFAULT_BREAK_MIN)
+                if new_start < win_end:
+                    free_windows[j] = (new_start, win_end)
                 else:
-                    j += 1
-            if not placed:
-                i += 1  # try next task
-        # next day
+                    free_windows.pop(j)
+            w[4] = remaining
+            if not free_windows:
+                break  # day is full
+        work = [w for w in work if w[4] > 0]
+        if not work:
+            break
 
     return schedule
 
+NOT_BUSY_TYPES = {"deadline", "notice"}   # synced events that don't occupy time
+
+def _local(s):
+    dt = _parse_dt(s)
+    return dt.astimezone().replace(tzinfo=None) if dt and dt.tzinfo else dt
+
+def load_busy_intervals(events_file=None, ics_files=()):
+    """(start, end) local-time intervals from the synced event store and/or .ics files.
+    All-day (date-only) entries are skipped: they're usually due dates, not blocked time."""
+    events = []
+    if events_file and Path(events_file).exists():
+        with open(events_file, "r", encoding="utf-8") as f:
+            events += json.load(f)
+    if ics_files:
+        from portal_fetcher import load_ics_events
+        tz = datetime.now().astimezone().tzinfo
+        for p in ics_files:
+            events += load_ics_events(p, tz)
+    out = []
+    for e in events:
+        when = e.get("when") or ""
+        if "T" not in when or (e.get("type") or "").lower() in NOT_BUSY_TYPES:
+            continue
+        s = _local(when)
+        if s is None:
+            continue
+        en = _local(e["end"]) if "T" in (e.get("end") or "") else None
+        out.append((s, en if en and en > s else s + timedelta(minutes=DEFAULT_EVENT_MIN)))
+    return out
+
+def _plan_issues(tasks, schedule):
+    """Blocks that end after their task's due time (by id(block)), plus report lines for
+    missed deadlines and for tasks the plan couldn't (fully) fit."""
+    dues = {t["id"]: _parse_dt(t["due"]) for t in tasks if t["due"]}
+    placed, last_end, late = {}, {}, set()
+    for blk in schedule:
+        e = _parse_dt(blk["end"])
+        tid = blk["task_id"]
+        placed[tid] = placed.get(tid, 0) + int((e - _parse_dt(blk["start"])).total_seconds() // 60)
+        last_end[tid] = max(last_end.get(tid, e), e)
+        if tid in dues and e > dues[tid]:
+            late.add(id(blk))
+    lines = []
+    for t in tasks:
+        due = dues.get(t["id"])
+        if due and t["id"] in last_end and last_end[t["id"]] > due:
+            lines.append(f"[LATE] {t['title']}: due {due:%Y-%m-%d %H:%M}, "
+                         f"last block ends {last_end[t['id']]:%Y-%m-%d %H:%M}")
+        left = t["duration_min"] - placed.get(t["id"], 0)
+        if left > 0:
+            lines.append(f"[UNPLACED] {t['title']}: {left}m of {t['duration_min']}m didn't fit in this plan"
+                         + (f" (due {due:%Y-%m-%d %H:%M})" if due else ""))
+    return late, lines
+
 def cmd_plan(args):
+    if not 0 < args.min_block <= MAX_BLOCK_MIN // 2:
+        print(f"[ERROR] --min-block must be between 1 and {MAX_BLOCK_MIN // 2} minutes")
+        return
     data = load_data()
     start, end = plan_window(args.period, args.start)
+    with span("plan.busy"):
+        try:
+            busy = load_busy_intervals(None if args.no_events else args.events, args.ics or ())
+        except OSError as e:
+            print(f"[ERROR] could not read calendar {e.filename or ''}: {e.strerror or e}")
+            return
     # Copy tasks snapshot
     tasks = [dict(t) for t in data["tasks"]]
 
     # Trim tasks to period window preference: prioritize tasks due within window
     filtered = []
-    for t in tasks:
-        due = dateparser.parse(t["due"]) if t["due"] else None
-        if (due is None) or (start.date() <= due.date() <= end.date()):
-            filtered.append(t)
+    with span("plan.filter", tasks=len(tasks)):
+        for t in tasks:
+            due = _parse_dt(t["due"]) if t["due"] else None
+            if (due is None) or (start.date() <= due.date() <= end.date()):
+                filtered.append(t)
     if not filtered:
         filtered = tasks  # if window has none, still plan from backlog
 
-    schedule = allocate(filtered, start, end)
+    schedule = allocate(filtered, start, end, busy=busy, min_block=args.min_block)
+    late, issues = _plan_issues(filtered, schedule)
 
     if not schedule:
         print("No schedule generated (not enough tasks or zero durations).")
+        for line in issues:
+            print(line)
         return
 
-    # Output pretty table and save file
-    out_lines = []
-    print(f"=== PLAN: {args.period.upper()} ({start.date()} -> {end.date()}) ===")
-    cur_day = None
-    for blk in sorted(schedule, key=lambda b: b["start"]):
-        s = dateparser.parse(blk["start"])
-        e = dateparser.parse(blk["end"])
-        if cur_day != s.date():
-            cur_day = s.date()
-            print(f"\n{cur_day} -------------------------")
-            out_lines.append(f"\n{cur_day} -------------------------")
-        line = f"{s.strftime('%H:%M')} - {e.strftime('%H:%M')} | [{LEVEL_TO_TEXT[blk['priority']]}] {blk['title']}"
-        if blk.get("course"):
-            line += f"  ({blk['course']})"
-        print(line)
-        out_lines.append(line)
-
+    # Output pretty table and save file (written line by line as it's printed)
+    schedule.sort(key=lambda b: b["start"])
     out_path = Path(__file__).with_name(f"plan{args.period}{start.date()}{end.date()}.txt")
-    out_path.write_text("\n".join(out_lines), encoding="utf-8")
+    with span("plan.render", blocks=len(schedule)), out_path.open("w", encoding="utf-8") as out:
+        print(f"=== PLAN: {args.period.upper()} ({start.date()} -> {end.date()}) ===")
+        cur_day = None
+        sep = ""
+        for blk in schedule:
+            s = _parse_dt(blk["start"])
+            e = _parse_dt(blk["end"])
+            if cur_day != s.date():
+                cur_day = s.date()
+                print(f"\n{cur_day} -------------------------")
+                out.write(f"{sep}\n{cur_day} -------------------------")
+                sep = "\n"
+            line = f"{s.strftime('%H:%M')} - {e.strftime('%H:%M')} | [{LEVEL_TO_TEXT[blk['priority']]}] {blk['title']}"
+            if blk.get("course"):
+                line += f"  ({blk['course']})"
+            if id(blk) in late:
+                line += "  [LATE]"
+            print(line)
+            out.write(sep + line)
+        if issues:
+            print()
+            out.write("\n")
+            for line in issues:
+                print(line)
+                out.write("\n" + line)
     print(f"\n[SAVED] {out_path.name}")
 
+    for fmt in args.export or ():
+        import plan_export
+        path = out_path.with_suffix("." + fmt)
+        with span(f"plan.export.{fmt}"):
+            if fmt == "bin":
+                plan_export.write_plan_bin(path, schedule)
+            else:
+                plan_export.write_plan_ics(path, schedule, LEVEL_TO_TEXT)
+        print(f"[SAVED] {path.name}")
+
 def cmd_clear(_args):
     save_data({"tasks": [], "completed": []})
     print("[CLEARED] All tasks removed.")
@@ -255,6 +661,10 @@ def cmd_clear(_args):
 # ---------------------------- CLI ----------------------------
 def build_parser():
     p = argparse.ArgumentParser(prog="planner", description="AI Student Planner (CLI)")
+    p.add_argument("--profile", action="store_true", help="Print a per-stage timing breakdown")
+    p.add_argument("--profile-alloc", action="store_true",
+                   help="With --profile/--profile-out, also track allocations (tracemalloc; inflates timings)")
+    p.add_argument("--profile-out", metavar="FILE", help="Also write spans as JSON lines to FILE")
     sub = p.add_subparsers(dest="cmd", required=True)
 
     a = sub.add_parser("add", help="Add a task in natural language")
@@ -262,19 +672,48 @@ def build_parser():
     a.add_argument("--notes", default="", help="Optional notes")
     a.set_defaults(func=cmd_add)
 
+    im = sub.add_parser("import", help="Add many tasks at once from a file or stdin")
+    im.add_argument("file", nargs="?", default="-", help="Path, or - for stdin (default)")
+    im.add_argument("--format", choices=["auto","lines","csv","json"], default="auto",
+                    help="lines: one natural-language task per line; csv/json: columns "
+                         "text|title, notes, course, duration, priority, due")
+    im.add_argument("--jobs", type=int, default=1, help="Parse in N worker processes")
+    im.add_argument("--strict", action="store_true", help="Import nothing if any row fails")
+    im.add_argument("--dry-run", action="store_true", help="Validate only, don't save")
+    im.set_defaults(func=cmd_import)
+
     sub.add_parser("list", help="List tasks").set_defaults(func=cmd_list)
 
+    se = sub.add_parser("search", help="Find tasks by words, course or due range")
+    se.add_argument("--text", help="Words that must all appear in title/notes")
+    se.add_argument("--course", help="Words that must all appear in the course")
+    se.add_argument("--due-after", help='Inclusive, e.g. "2025-11-01" or "next monday"')
+    se.add_argument("--due-before", help='Inclusive; a bare YYYY-MM-DD covers that whole day')
+    se.add_argument("--limit", type=int, default=0, help="Show at most N results")
+    se.set_defaults(func=cmd_search)
+
     d = sub.add_parser("delete", help="Delete task by ID")
     d.add_argument("id")
     d.set_defaults(func=cmd_delete)
 
     dn = sub.add_parser("done", help="Mark task done by ID")
     dn.add_argument("id")
+    dn.add_argument("--spent", help='Actual time spent, e.g. "90" (minutes), "90m" or "1.5h"')
     dn.set_defaults(func=cmd_done)
 
+    stt = sub.add_parser("stats", help="Throughput, lateness and estimate accuracy from completed tasks")
+    stt.add_argument("--weeks", type=int, default=8, help="Weeks of throughput to show")
+    stt.set_defaults(func=cmd_stats)
+
     pl = sub.add_parser("plan", help="Generate plan")
     pl.add_argument("--period", choices=["day","week","month"], default="day")
     pl.add_argument("--start", help="YYYY-MM-DD (default=today)")
+    pl.add_argument("--events", default=str(EVENTS_FILE), help="Synced event store to plan around")
+    pl.add_argument("--no-events", action="store_true", help="Ignore the synced event store")
+    pl.add_argument("--ics", action="append", metavar="FILE", help="Also plan around an .ics calendar (repeatable)")
+    pl.add_argument("--min-block", type=int, default=MIN_BLOCK_MIN, help="Shortest chunk a task may be split into (minutes)")
+    pl.add_argument("--export", action="append", choices=["bin","ics"],
+                    help="Also write the plan as fixed-width binary (plan_export.PlanFile) or .ics (repeatable)")
     pl.set_defaults(func=cmd_plan)
 
     sub.add_parser("clear", help="Remove all tasks").set_defaults(func=cmd_clear)
@@ -291,7 +730,18 @@ def generate_all_periods():
 def main():
     parser = build_parser()
     args = parser.parse_args()
-    args.func(args)
+    if args.profile or args.profile_out:
+        tracing.enable(track_alloc=args.profile_alloc)
+    try:
+        with span(f"cmd.{args.cmd}"):
+            args.func(args)
+    finally:
+        if tracing.is_enabled():
+            if args.profile:
+                tracing.report()
+            if args.profile_out:
+                tracing.export_jsonl(args.profile_out)
+                print(f"[PROFILE] spans -> {args.profile_out}", file=sys.stderr)
 
 # ---- handle "all" mode before running normal CLI ----
 if __name__ == "__main__":
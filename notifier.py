@@ -1,15 +1,20 @@
 # notifier.py
-import smtplib
+import os, smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") != "0"   # off only for local test servers
+
 def send_email(smtp_user: str, smtp_pass: str, to: str, subject: str, html: str):
     msg = MIMEMultipart("alternative")
     msg["Subject"] = subject
     msg["From"]    = smtp_user
     msg["To"]      = to
     msg.attach(MIMEText(html, "html"))
-    with smtplib.SMTP("smtp.gmail.com", 587) as server:
-        server.starttls()
+    with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
+        if SMTP_STARTTLS:
+            server.starttls()
         server.login(smtp_user, smtp_pass)   # app password, 16 chars, no spaces
         server.sendmail(smtp_user, [to], msg.as_string())
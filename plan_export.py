@@ -0,0 +1,151 @@
+# plan_export.py — machine-readable plan exports: fixed-width binary (mmap-able) and streamed ICS
+#
+# Binary layout (little-endian):
+#   header  24 bytes  magic b"PLNB", version u16, record size u16, count u32, table offset u64, pad u32
+#   records count x 24 bytes  start i64, end i64 (unix epoch seconds), task index u32, priority u8, pad 3
+#   table   UTF-8 JSON list of {"id","title","course"}; task index points into it
+# Records sit at a fixed offset with a fixed stride, so readers can mmap the file
+# and index (or numpy.frombuffer) them in place instead of parsing text.
+
+from __future__ import annotations
+import json, mmap, struct
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+MAGIC = b"PLNB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIQ4x")
+RECORD = struct.Struct("<qqIB3x")
+assert HEADER.size == RECORD.size == 24
+
+# numpy view of RECORD, for PlanFile.as_array()
+RECORD_DTYPE = [("start", "<i8"), ("end", "<i8"), ("task", "<u4"), ("priority", "u1"), ("_pad", "V3")]
+
+def _epoch(iso: str) -> int:
+    # plan blocks are naive local time; timestamp() interprets them as such
+    return int(datetime.fromisoformat(iso).timestamp())
+
+# ---------------------------- Binary ----------------------------
+def write_plan_bin(path, schedule: Iterable[Dict]) -> int:
+    """Stream blocks to `path`; returns the record count. Blocks should be sorted by start."""
+    tasks: List[Dict] = []
+    index: Dict[str, int] = {}
+    n = 0
+    with open(path, "wb") as f:
+        f.write(b"\0" * HEADER.size)  # patched once the count and table offset are known
+        for blk in schedule:
+            i = index.get(blk["task_id"])
+            if i is None:
+                i = index[blk["task_id"]] = len(tasks)
+                tasks.append({"id": blk["task_id"], "title": blk["title"], "course": blk.get("course")})
+            f.write(RECORD.pack(_epoch(blk["start"]), _epoch(blk["end"]), i, blk["priority"]))
+            n += 1
+        table_offset = f.tell()
+        f.write(json.dumps(tasks, ensure_ascii=False).encode("utf-8"))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, n, table_offset))
+    return n
+
+class PlanFile:
+    """Read-only mmap of a plan .bin. Records are unpacked on access, never copied wholesale.
+
+        with PlanFile("planweek....bin") as p:
+            for start, end, task, prio in p: ...
+            arr = p.as_array()          # zero-copy numpy structured view
+    """
+
+    def __init__(self, path):
+        self._f = open(path, "rb")
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, rec_size, self.count, self._table_offset = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or rec_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path}: not a plan file")
+        if version > VERSION:
+            self.close()
+            raise ValueError(f"{path}: plan format v{version} is newer than this reader (v{VERSION})")
+        self._tasks = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> Tuple[int, int, int, int]:
+        if not -self.count <= i < self.count:
+            raise IndexError(i)
+        return RECORD.unpack_from(self._mm, HEADER.size + (i % self.count) * RECORD.size)
+
+    def __iter__(self) -> Iterator[Tuple[int, int, int, int]]:
+        return RECORD.iter_unpack(memoryview(self._mm)[HEADER.size:self._table_offset])
+
+    @property
+    def tasks(self) -> List[Dict]:
+        if self._tasks is None:
+            self._tasks = json.loads(self._mm[self._table_offset:].decode("utf-8"))
+        return self._tasks
+
+    def as_array(self):
+        import numpy as np
+        return np.frombuffer(self._mm, dtype=np.dtype(RECORD_DTYPE), count=self.count, offset=HEADER.size)
+
+    def close(self):
+        # a live numpy view from as_array() keeps the mapping exported; leave it to GC then
+        try:
+            self._mm.close()
+        except BufferError:
+            pass
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+# ---------------------------- ICS ----------------------------
+def _ics_text(s: str) -> str:
+    return (s.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+             .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+def _fold(line: str) -> str:
+    # RFC 5545 3.1: lines longer than 75 octets continue on lines starting with a space
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line + "\r\n"
+    out, cur, size = [], [], 0
+    for ch in line:
+        n = len(ch.encode("utf-8"))
+        if size + n > (75 if not out else 74):
+            out.append("".join(cur))
+            cur, size = [], 0
+        cur.append(ch)
+        size += n
+    out.append("".join(cur))
+    return "\r\n ".join(out) + "\r\n"
+
+def _utc(iso: str) -> str:
+    return datetime.fromtimestamp(_epoch(iso), timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+def iter_ics(schedule: Iterable[Dict], level_to_text: Dict[int, str] = None) -> Iterator[str]:
+    """Yield the calendar one VEVENT block at a time."""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    yield "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Pairent//AI Student Planner//EN\r\nCALSCALE:GREGORIAN\r\n"
+    for blk in schedule:
+        lines = ["BEGIN:VEVENT",
+                 f"UID:{blk['task_id']}-{_epoch(blk['start'])}@pairent",
+                 f"DTSTAMP:{stamp}",
+                 f"DTSTART:{_utc(blk['start'])}",
+                 f"DTEND:{_utc(blk['end'])}",
+                 f"SUMMARY:{_ics_text(blk['title'])}"]
+        if blk.get("course"):
+            lines.append(f"CATEGORIES:{_ics_text(blk['course'])}")
+        if level_to_text:
+            lines.append(f"DESCRIPTION:Priority: {level_to_text.get(blk['priority'], blk['priority'])}")
+        lines.append("END:VEVENT")
+        yield "".join(_fold(l) for l in lines)
+    yield "END:VCALENDAR\r\n"
+
+def write_plan_ics(path, schedule: Iterable[Dict], level_to_text: Dict[int, str] = None) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for block in iter_ics(schedule, level_to_text):
+            f.write(block)
@@ -1,20 +1,53 @@
 # portal_fetcher.py
 from __future__ import annotations
+import threading
 import requests
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from typing import List, Dict
 from ics import Calendar
 
+from tracing import span, count
+
+# ics' parser keeps shared state and breaks when two threads parse at once
+# (seen under loadtest.py concurrency); downloads still run in parallel.
+_PARSE_LOCK = threading.Lock()
+
+def _parse_calendar(text: str) -> Calendar:
+    # lock wait gets its own span so ics.parse measures parsing only
+    with span("ics.parse_wait"):
+        _PARSE_LOCK.acquire()
+    try:
+        with span("ics.parse"):
+            return Calendar(text)
+    finally:
+        _PARSE_LOCK.release()
+
 def fetch_ics_events(ics_url: str, tz: ZoneInfo) -> List[Dict]:
     """Download an ICS and normalize to Païrent's event dicts."""
     try:
-        r = requests.get(ics_url, timeout=20)
-        r.raise_for_status()
-        cal = Calendar(r.text)
+        with span("ics.http"):
+            r = requests.get(ics_url, timeout=20)
+            r.raise_for_status()
+        count("ics.bytes", len(r.content))
+        cal = _parse_calendar(r.text)
     except Exception:
         return []
 
+    events: List[Dict] = []
+    with span("ics.normalize"):
+        events = _normalize(cal, tz)
+    count("ics.events", len(events))
+    return events
+
+def load_ics_events(path: str, tz: ZoneInfo) -> List[Dict]:
+    """Same as fetch_ics_events, for an .ics file on disk."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    cal = _parse_calendar(text)
+    return _normalize(cal, tz)
+
+def _normalize(cal: Calendar, tz: ZoneInfo) -> List[Dict]:
     events: List[Dict] = []
     for e in cal.events:
         # Start/end handling (can be date or datetime)
@@ -29,6 +62,7 @@ def fetch_ics_events(ics_url: str, tz: ZoneInfo) -> List[Dict]:
             "type": "class" if "class" in (e.name or "").lower() else "event",
             "title": (e.name or "Calendar item").strip(),
             "when": start.isoformat() if isinstance(start, datetime) else str(start),
+            "end": end.isoformat() if isinstance(end, datetime) else (str(end) if end else ""),
             "location": (e.location or "").strip(),
             "notes": (e.description or "").strip(),
             "source": "portal-ics"
@@ -3,6 +3,8 @@ import os, re, requests
 from bs4 import BeautifulSoup
 from datetime import datetime
 
+from tracing import span, count
+
 # --- Detect known university systems automatically ---
 KNOWN_PORTALS = [
     "obs.", "lms.", "moodle.", "teams.", "edu.tr", "abs.", "sis.", "campus."
@@ -29,15 +31,19 @@ def fetch_portal_texts(email_bodies: list[str]) -> list[str]:
 
     for url in portal_links:
         try:
-            r = requests.get(url, timeout=10)
+            with span("portal.http"):
+                r = requests.get(url, timeout=10)
+            count("portal.pages")
             if r.status_code == 200:
-                soup = BeautifulSoup(r.text, "html.parser")
+                with span("portal.html"):
+                    soup = BeautifulSoup(r.text, "html.parser")
 
-                # Try to find academic words (exam, schedule, class, deadline)
-                text = soup.get_text(separator=" ", strip=True)
+                    # Try to find academic words (exam, schedule, class, deadline)
+                    text = soup.get_text(separator=" ", strip=True)
                 if any(word in text.lower() for word in ["exam", "schedule", "class", "deadline", "ders", "sınav", "hafta"]):
                     texts.append(text[:3000])  # limit for safety
         except Exception as e:
+            count("portal.errors")
             print("Portal scrape failed:", e)
 
     # fallback: if no portals detected
@@ -0,0 +1,269 @@
+# reminders.py — lead-time reminders for synced events and open tasks
+#
+# Runs as its own process next to the app/CLI:
+#   SMTP_USER=... SMTP_PASS=... [REMINDER_TO=...] python reminders.py
+# (without SMTP credentials reminders are printed). It watches data/events.json
+# and planner_data.json and re-syncs whenever either is rewritten, so auto-sync,
+# add, import, done and delete are picked up without any calls into this module.
+
+from __future__ import annotations
+import heapq, itertools, json, os, time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from notifier import send_email
+
+TIMEZONE = ZoneInfo("Europe/Istanbul")
+LEAD_TIMES = (timedelta(hours=24), timedelta(hours=1))
+TICK_SECONDS = 60
+
+def _parse_when(s: Optional[str], tz: ZoneInfo = TIMEZONE) -> Optional[datetime]:
+    """ISO string -> aware datetime (naive values are taken as local `tz`)."""
+    if not s:
+        return None
+    try:
+        dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    except Exception:
+        return None
+    return dt.replace(tzinfo=tz) if dt.tzinfo is None else dt
+
+def event_key(e: Dict) -> Tuple:
+    # synced events have no id; title+when is what the sync dedupe uses too
+    return ("event", e.get("title", ""), e.get("when", ""))
+
+def task_key(t: Dict) -> Tuple:
+    return ("task", t["id"])
+
+class ReminderEngine:
+    """
+    Min-heap of (fire_at, seq, key, gen, lead). Adding an item pushes one entry per
+    lead time (O(log n)); removing or re-adding bumps the item's generation so old
+    heap entries are skipped lazily when they surface. The heap is compacted once
+    stale entries outnumber live ones, so memory stays proportional to pending work.
+    """
+
+    def __init__(self, lead_times: Iterable[timedelta] = LEAD_TIMES,
+                 send: Optional[Callable[[Dict, timedelta, datetime], None]] = None,
+                 tz: ZoneInfo = TIMEZONE):
+        self.lead_times = tuple(sorted(lead_times, reverse=True))
+        self.send = send or _print_reminder
+        self.tz = tz
+        self._heap: List[Tuple] = []
+        self._items: Dict[Tuple, List] = {}  # key -> [gen, item, due, pending heap entries]
+        self._gen = itertools.count()
+        self._seq = itertools.count()
+        self._live = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    # ---------- updates ----------
+    def add(self, key: Tuple, item: Dict, due: Optional[datetime], now: Optional[datetime] = None):
+        """Index `item` due at `due` (see _schedule). Items already past aren't tracked."""
+        self.remove(key)
+        plan = self._schedule(due, now or datetime.now(self.tz))
+        if not plan:
+            return
+        gen = next(self._gen)
+        self._items[key] = [gen, item, due, len(plan)]
+        for fire_at, lead in plan:
+            heapq.heappush(self._heap, (fire_at, next(self._seq), key, gen, lead))
+        self._live += len(plan)
+
+    def remove(self, key: Tuple):
+        entry = self._items.pop(key, None)
+        if entry is None:
+            return
+        # old-generation entries stay in the heap until popped or compacted
+        self._live -= entry[3]
+        self._maybe_compact()
+
+    def add_event(self, e: Dict, now: Optional[datetime] = None):
+        self.add(event_key(e), e, _parse_when(e.get("when"), self.tz), now)
+
+    def add_task(self, t: Dict, now: Optional[datetime] = None):
+        self.add(task_key(t), t, _parse_when(t.get("due"), self.tz), now)
+
+    def sync_events(self, events: List[Dict], now: Optional[datetime] = None):
+        """Bring indexed events in line with `events`, touching only what changed."""
+        wanted = {event_key(e): e for e in events}
+        for key in [k for k in self._items if k[0] == "event" and k not in wanted]:
+            self.remove(key)
+        for key, e in wanted.items():
+            if key not in self._items:
+                self.add_event(e, now)
+        self._prune(now)
+
+    def sync_tasks(self, tasks: List[Dict], now: Optional[datetime] = None):
+        """Same for open tasks: done/deleted ones drop out, new or re-dated ones are (re)added."""
+        wanted = {task_key(t): t for t in tasks}
+        for key in [k for k in self._items if k[0] == "task" and k not in wanted]:
+            self.remove(key)
+        for key, t in wanted.items():
+            cur = self._items.get(key)
+            if cur is None or cur[1].get("due") != t.get("due"):
+                self.add_task(t, now)
+        self._prune(now)
+
+    def rebuild(self, events: List[Dict], tasks: List[Dict], now: Optional[datetime] = None):
+        """Reset from the stores (used on startup); heapify keeps this O(n)."""
+        now = now or datetime.now(self.tz)
+        self._heap, self._items, self._live = [], {}, 0
+        for key, item, field in [(event_key(e), e, "when") for e in events] + \
+                                [(task_key(t), t, "due") for t in tasks]:
+            due = _parse_when(item.get(field), self.tz)
+            plan = self._schedule(due, now)
+            if not plan:
+                continue
+            gen = next(self._gen)
+            self._items[key] = [gen, item, due, len(plan)]
+            for fire_at, lead in plan:
+                self._heap.append((fire_at, next(self._seq), key, gen, lead))
+        heapq.heapify(self._heap)
+        self._live = len(self._heap)
+
+    # ---------- firing ----------
+    def next_fire_at(self) -> Optional[datetime]:
+        self._drop_stale_top()
+        return self._heap[0][0] if self._heap else None
+
+    def due_reminders(self, now: Optional[datetime] = None) -> List[Tuple[Dict, timedelta]]:
+        """Pop every reminder whose fire time is <= now. Cost is O(k log n) for k fired."""
+        now = now or datetime.now(self.tz)
+        fired = []
+        while True:
+            self._drop_stale_top()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            fire_at, _, key, _, lead = heapq.heappop(self._heap)
+            entry = self._items[key]
+            entry[3] -= 1
+            self._live -= 1
+            # a catch-up reminder fires late: report the time that was actually left
+            fired.append((entry[1], min(lead, entry[2] - fire_at)))
+        return fired
+
+    def tick(self, now: Optional[datetime] = None) -> int:
+        now = now or datetime.now(self.tz)
+        fired = self.due_reminders(now)
+        for item, lead in fired:
+            try:
+                self.send(item, lead, now)
+            except Exception as e:
+                print("Reminder failed:", e)
+        return len(fired)
+
+    # ---------- internals ----------
+    def _schedule(self, due: Optional[datetime], now: datetime) -> List[Tuple[datetime, timedelta]]:
+        """(fire_at, lead) pairs for an item due at `due`: each lead time still ahead, plus
+        the latest one already missed, fired at once (restart, or synced inside its lead
+        window), as long as the item itself is still ahead."""
+        if due is None or due <= now:
+            return []
+        plan = [(due - lead, lead) for lead in self.lead_times if due - lead >= now]
+        missed = [lead for lead in self.lead_times if due - lead < now]
+        if missed:
+            plan.append((now, min(missed)))
+        return plan
+
+    def _prune(self, now: Optional[datetime] = None):
+        # fully fired items are kept until they're due, so a re-sync doesn't fire them again
+        now = now or datetime.now(self.tz)
+        for key in [k for k, v in self._items.items() if v[3] == 0 and v[2] <= now]:
+            del self._items[key]
+
+    def _is_stale(self, entry: Tuple) -> bool:
+        cur = self._items.get(entry[2])
+        return cur is None or cur[0] != entry[3]
+
+    def _drop_stale_top(self):
+        while self._heap and self._is_stale(self._heap[0]):
+            heapq.heappop(self._heap)
+
+    def _maybe_compact(self):
+        if len(self._heap) > 64 and len(self._heap) > 2 * self._live:
+            self._heap = [e for e in self._heap if not self._is_stale(e)]
+            heapq.heapify(self._heap)
+            self._live = len(self._heap)
+
+# ---------- delivery ----------
+def _lead_label(lead: timedelta) -> str:
+    hours = int(lead.total_seconds() // 3600)
+    if hours >= 24 and hours % 24 == 0:
+        return f"{hours // 24} day" + ("s" if hours >= 48 else "")
+    if hours >= 1:
+        return f"{hours} hour" + ("s" if hours > 1 else "")
+    return f"{int(lead.total_seconds() // 60)} min"
+
+def _print_reminder(item: Dict, lead: timedelta, _now: datetime):
+    when = item.get("when") or item.get("due")
+    print(f"[REMINDER] in {_lead_label(lead)}: {item.get('title', '(no title)')} ({when})")
+
+def email_sender(smtp_user: str, smtp_pass: str, to: str) -> Callable[[Dict, timedelta, datetime], None]:
+    """Build a `send` callback that delivers reminders through notifier.send_email."""
+    def _send(item: Dict, lead: timedelta, _now: datetime):
+        title = item.get("title", "(no title)")
+        when = item.get("when") or item.get("due") or ""
+        html = f"""
+        <div style="font-family:Inter,Arial,sans-serif">
+          <h2 style="color:#00ADB5;margin:0 0 8px">Coming up in {_lead_label(lead)}</h2>
+          <p><b>{title}</b><br>🕒 {when}<br>📍 {item.get('location', '')}</p>
+          <p style="opacity:.7">— Pairent</p>
+        </div>
+        """
+        send_email(smtp_user, smtp_pass, to, f"Reminder: {title} in {_lead_label(lead)}", html)
+    return _send
+
+# ---------- stores ----------
+def _events_path() -> str:
+    return os.path.join("data", "events.json")  # scheduler.EVENTS_JSON (scheduler imports us)
+
+def _tasks_path() -> str:
+    from main import DATA_FILE
+    return str(DATA_FILE)
+
+def _load_json(path: str, key: Optional[str] = None) -> List[Dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return []
+    return data.get(key, []) if key else data
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def build_engine(send=None, lead_times: Iterable[timedelta] = LEAD_TIMES) -> ReminderEngine:
+    """Create an engine pre-loaded from the event store and the CLI task store."""
+    engine = ReminderEngine(lead_times, send)
+    engine.rebuild(_load_json(_events_path()), _load_json(_tasks_path(), "tasks"))
+    return engine
+
+def run_forever(engine: ReminderEngine, tick_seconds: int = TICK_SECONDS):
+    """Sleep until the next reminder (at most `tick_seconds`), fire, repeat. Either store
+    changing on disk (sync, add, done, delete, import) is re-synced before the next tick."""
+    stores = [(_events_path(), None, engine.sync_events), (_tasks_path(), "tasks", engine.sync_tasks)]
+    seen = {path: _mtime(path) for path, _, _ in stores}  # build_engine just read these
+    while True:
+        for path, key, sync in stores:
+            m = _mtime(path)
+            if m != seen[path]:
+                seen[path] = m
+                sync(_load_json(path, key))
+        engine.tick()
+        nxt = engine.next_fire_at()
+        wait = tick_seconds
+        if nxt is not None:
+            wait = max(1, min(wait, (nxt - datetime.now(engine.tz)).total_seconds()))
+        time.sleep(wait)
+
+if __name__ == "__main__":
+    user, pw = os.getenv("SMTP_USER"), os.getenv("SMTP_PASS")
+    send = email_sender(user, pw, os.getenv("REMINDER_TO", user)) if user and pw else None
+    eng = build_engine(send)
+    print(f"[REMINDERS] {len(eng)} pending")
+    run_forever(eng)
@@ -7,6 +7,7 @@ from zoneinfo import ZoneInfo
 
 from email_reader import fetch_recent_emails
 from ai_parser import parse_updates_to_events
+from tracing import traced
 
 # --- Settings ---
 TIMEZONE = ZoneInfo("Europe/Istanbul")  # Turkey time
@@ -31,6 +32,7 @@ def save_events(events: list[dict]):
     with open(EVENTS_JSON, "w", encoding="utf-8") as f:
         json.dump(events, f, ensure_ascii=False, indent=2)
 
+@traced("sync.auto")
 def run_auto_sync():
     """Fetch emails, parse with AI, and save new events."""
     try:
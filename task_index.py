@@ -0,0 +1,143 @@
+# task_index.py — search index over the open-task list (planner_data.json "tasks")
+#
+#   text     word -> positions (title + notes)        for --text
+#   course   word -> positions (course)               for --course
+#   due      sorted due strings + their positions     for --due-before/--due-after
+#
+# Positions index data["tasks"] as loaded, so hits map straight back to tasks in
+# store order. `planner search` keeps the index next to the store
+# (planner_data.search.npz: plain arrays and JSON word lists, read with
+# allow_pickle=False), stamped with the store file's mtime and size. Any later
+# write leaves the stamp stale and the next search rebuilds it; add/import/
+# done/delete never touch it.
+
+from __future__ import annotations
+import itertools, json, os, re, zipfile
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+INDEX_VERSION = 2
+
+def tokenize(text: Optional[str]) -> Set[str]:
+    return set(TOKEN_RE.findall(text.lower())) if text else set()
+
+# (sorted words, offsets, positions): word i's postings are positions[offsets[i]:offsets[i+1]]
+Postings = Tuple[List[str], np.ndarray, np.ndarray]
+
+def _postings(index: Dict[str, List[int]]) -> Postings:
+    words = sorted(index)
+    offsets = np.zeros(len(words) + 1, dtype=np.int64)
+    np.cumsum([len(index[w]) for w in words], out=offsets[1:])
+    positions = np.fromiter(itertools.chain.from_iterable(index[w] for w in words),
+                            dtype=np.int32, count=int(offsets[-1]))
+    return words, offsets, positions
+
+def _json_bytes(obj) -> np.ndarray:
+    return np.frombuffer(json.dumps(obj, ensure_ascii=False).encode("utf-8"), dtype=np.uint8)
+
+def _from_json_bytes(arr: np.ndarray):
+    return json.loads(arr.tobytes().decode("utf-8"))
+
+class TaskIndex:
+    def __init__(self, n: int, text: Postings, course: Postings, due_keys: List[str], due_pos: np.ndarray):
+        self.n = n
+        self.text, self.course = text, course
+        self.due_keys, self.due_pos = due_keys, due_pos
+
+    def __len__(self) -> int:
+        return self.n
+
+    @classmethod
+    def build(cls, tasks: List[Dict]) -> "TaskIndex":
+        text: Dict[str, List[int]] = {}
+        course: Dict[str, List[int]] = {}
+        dated = []
+        for pos, t in enumerate(tasks):
+            for w in tokenize(t.get("title")) | tokenize(t.get("notes")):
+                text.setdefault(w, []).append(pos)
+            for w in tokenize(t.get("course")):
+                course.setdefault(w, []).append(pos)
+            if t.get("due"):
+                dated.append((t["due"], pos))
+        dated.sort()
+        return cls(len(tasks), _postings(text), _postings(course),
+                   [d for d, _ in dated], np.fromiter((p for _, p in dated), dtype=np.int32, count=len(dated)))
+
+    # ---------- queries ----------
+    def search(self, text: Optional[str] = None, course: Optional[str] = None,
+               due_after: Optional[str] = None, due_before: Optional[str] = None) -> Optional[np.ndarray]:
+        """Sorted positions of tasks matching every given filter, or None when no filter
+        was given (everything matches). Words must all be present (AND); due bounds are
+        ISO strings, inclusive, and exclude undated tasks."""
+        cands = [self._lookup(self.text, w) for w in tokenize(text)] + \
+                [self._lookup(self.course, w) for w in tokenize(course)]
+        cands.sort(key=len)  # most selective first
+        hits = cands[0] if cands else None
+        for other in cands[1:]:
+            hits = self._keep(hits, other)
+        if due_after is not None or due_before is not None:
+            lo = bisect_left(self.due_keys, due_after) if due_after else 0
+            hi = bisect_right(self.due_keys, due_before) if due_before else len(self.due_keys)
+            in_range = self.due_pos[lo:hi]
+            hits = np.sort(in_range) if hits is None else self._keep(hits, in_range)
+        return hits
+
+    @staticmethod
+    def _lookup(index: Postings, word: str) -> np.ndarray:
+        words, offsets, positions = index
+        i = bisect_left(words, word)
+        if i < len(words) and words[i] == word:
+            return positions[offsets[i]:offsets[i + 1]]
+        return positions[:0]
+
+    def _keep(self, hits: np.ndarray, other: np.ndarray) -> np.ndarray:
+        # membership through a mask over all positions: O(len(hits) + len(other)), no sort
+        if not len(hits) or not len(other):
+            return hits[:0]
+        mask = np.zeros(self.n, dtype=bool)
+        mask[other] = True
+        return hits[mask[hits]]
+
+    # ---------- persistence ----------
+    def save(self, path: Path, stamp: Tuple[int, int]):
+        arrays = {"meta": _json_bytes({"version": INDEX_VERSION, "stamp": list(stamp), "n": self.n})}
+        for name, (words, offsets, positions) in (("text", self.text), ("course", self.course)):
+            arrays[f"{name}_words"] = _json_bytes(words)
+            arrays[f"{name}_offsets"] = offsets
+            arrays[f"{name}_positions"] = positions
+        arrays["due_keys"] = _json_bytes(self.due_keys)
+        arrays["due_positions"] = self.due_pos
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, stamp: Optional[Tuple[int, int]], n: int) -> Optional["TaskIndex"]:
+        """The saved index if it was built from the store as stamped, else None."""
+        if stamp is None:
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as z:
+                meta = _from_json_bytes(z["meta"])
+                if meta != {"version": INDEX_VERSION, "stamp": list(stamp), "n": n}:
+                    return None
+                text, course = ((_from_json_bytes(z[f"{k}_words"]), z[f"{k}_offsets"], z[f"{k}_positions"])
+                                for k in ("text", "course"))
+                return cls(n, text, course, _from_json_bytes(z["due_keys"]), z["due_positions"])
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return None
+
+def index_path(data_file) -> Path:
+    return Path(data_file).with_suffix(".search.npz")
+
+def store_stamp(data_file) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(data_file)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
@@ -0,0 +1,201 @@
+# tracing.py — named spans + counters for profiling the sync/plan pipeline
+# Off by default: span() hands back a shared no-op context and count() returns
+# immediately, so instrumented code pays one lookup when profiling is off.
+#
+# Records go to a Collector. The CLI and loadtest use the process-wide one via
+# enable()/disable(); the Streamlit app gives each session its own with
+# set_collector(), since every session shares this module.
+
+from __future__ import annotations
+import contextvars, json, sys, threading, time, tracemalloc
+from functools import wraps
+from typing import Dict, List, Optional
+
+_local = threading.local()
+
+class Collector:
+    """One profiling run's spans and counters."""
+
+    def __init__(self, track_alloc: bool = False):
+        self.track_alloc = track_alloc
+        self.lock = threading.Lock()
+        self.spans: List[Dict] = []
+        self.counters: Dict[str, int] = {}
+
+    def reset(self):
+        with self.lock:
+            self.spans.clear()
+            self.counters.clear()
+
+    def add(self, rec: Dict):
+        with self.lock:
+            self.spans.append(rec)
+
+    def count(self, name: str, n: int = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.spans), dict(self.counters)
+
+_GLOBAL = Collector()
+_enabled = False
+_current: contextvars.ContextVar[Optional[Collector]] = contextvars.ContextVar("tracing_collector", default=None)
+
+def _active() -> Optional[Collector]:
+    c = _current.get()
+    if c is not None:
+        return c
+    return _GLOBAL if _enabled else None
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+    def set(self, **attrs):
+        pass
+
+_NULL = _NullSpan()
+
+class _Span:
+    __slots__ = ("name", "attrs", "t0", "m0", "depth", "sink")
+
+    def __init__(self, name: str, attrs: Dict, sink: Collector):
+        self.name, self.attrs, self.sink = name, attrs, sink
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.depth = len(stack)
+        stack.append(self.name)
+        self.m0 = tracemalloc.get_traced_memory()[0] if self.sink.track_alloc else 0
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *_):
+        dur = time.perf_counter() - self.t0
+        alloc = tracemalloc.get_traced_memory()[0] - self.m0 if self.sink.track_alloc else 0
+        _local.stack.pop()
+        rec = {"name": self.name, "start": self.t0, "ms": dur * 1000.0, "alloc_kb": alloc / 1024.0,
+               "depth": self.depth, "thread": threading.get_ident(), "error": exc_type.__name__ if exc_type else None}
+        if self.attrs:
+            rec["attrs"] = self.attrs
+        self.sink.add(rec)
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+# ---------- control ----------
+def enable(track_alloc: bool = False):
+    """Start recording spans process-wide. `track_alloc` also turns on tracemalloc
+    (adds ~2-3x to timings, so keep it off when the numbers matter)."""
+    global _enabled
+    _enabled, _GLOBAL.track_alloc = True, track_alloc
+    if track_alloc and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def disable():
+    global _enabled
+    if _GLOBAL.track_alloc and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _enabled = _GLOBAL.track_alloc = False
+
+def is_enabled() -> bool:
+    return _active() is not None
+
+def reset():
+    _GLOBAL.reset()
+
+def set_collector(collector: Optional[Collector]):
+    """Route spans in the current context (thread / Streamlit script run) to
+    `collector`; None goes back to the process-wide setting."""
+    _current.set(collector)
+
+# ---------- instrumentation ----------
+def span(name: str, **attrs):
+    """`with span("imap.fetch", n=25): ...` — records wall time (and net allocation)."""
+    c = _active()
+    if c is None:
+        return _NULL
+    return _Span(name, attrs, c)
+
+def count(name: str, n: int = 1):
+    c = _active()
+    if c is not None:
+        c.count(name, n)
+
+def traced(name: Optional[str] = None):
+    """Decorator form of span(); defaults to module.function."""
+    def deco(fn):
+        label = name or f"{fn.__module__}.{fn.__name__}"
+        @wraps(fn)
+        def wrapper(*a, **kw):
+            c = _active()
+            if c is None:
+                return fn(*a, **kw)
+            with _Span(label, {}, c):
+                return fn(*a, **kw)
+        return wrapper
+    return deco
+
+# ---------- reporting ----------
+# Each takes an explicit collector; the default is the process-wide one.
+def summary(collector: Optional[Collector] = None) -> List[Dict]:
+    """Per-span-name aggregate, in order of first appearance."""
+    rows: Dict[str, Dict] = {}
+    spans, _ = (collector or _GLOBAL).snapshot()
+    for s in sorted(spans, key=lambda s: s["start"]):
+        r = rows.setdefault(s["name"], {"name": s["name"], "depth": s["depth"], "calls": 0,
+                                        "total_ms": 0.0, "max_ms": 0.0, "alloc_kb": 0.0, "errors": 0})
+        r["calls"] += 1
+        r["total_ms"] += s["ms"]
+        r["max_ms"] = max(r["max_ms"], s["ms"])
+        r["alloc_kb"] += s["alloc_kb"]
+        r["errors"] += 1 if s["error"] else 0
+    for r in rows.values():
+        r["mean_ms"] = r["total_ms"] / r["calls"]
+    return list(rows.values())
+
+def spans(collector: Optional[Collector] = None) -> List[Dict]:
+    """Raw span records (copies of the list, not the dicts)."""
+    return (collector or _GLOBAL).snapshot()[0]
+
+def counters(collector: Optional[Collector] = None) -> Dict[str, int]:
+    return (collector or _GLOBAL).snapshot()[1]
+
+def format_report(collector: Optional[Collector] = None) -> str:
+    c = collector or _GLOBAL
+    rows, cs = summary(c), counters(c)
+    if not rows and not cs:
+        return "[PROFILE] nothing recorded"
+    alloc = c.track_alloc
+    lines = ["=== PROFILE ===",
+             f"{'stage':38} {'calls':>6} {'total ms':>10} {'mean ms':>9} {'max ms':>9}"
+             + (f" {'alloc KB':>10}" if alloc else "")]
+    for r in rows:
+        label = ("  " * r["depth"] + r["name"])[:38]
+        lines.append(f"{label:38} {r['calls']:>6} {r['total_ms']:>10.2f} {r['mean_ms']:>9.2f} {r['max_ms']:>9.2f}"
+                     + (f" {r['alloc_kb']:>10.1f}" if alloc else "")
+                     + (f"  ({r['errors']} err)" if r["errors"] else ""))
+    if cs:
+        lines.append("--- counters ---")
+        lines += [f"{k:38} {v:>6}" for k, v in sorted(cs.items())]
+    return "\n".join(lines)
+
+def report(file=None, collector: Optional[Collector] = None):
+    print(format_report(collector), file=file or sys.stderr)
+
+def to_jsonl(collector: Optional[Collector] = None) -> str:
+    """Every span, then a final counters record, one JSON object per line."""
+    spans, cs = (collector or _GLOBAL).snapshot()
+    lines = [json.dumps(s, ensure_ascii=False, default=str) for s in spans]
+    lines.append(json.dumps({"counters": cs}, ensure_ascii=False))
+    return "\n".join(lines) + "\n"
+
+def export_jsonl(path: str, collector: Optional[Collector] = None):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(to_jsonl(collector))